@@ -0,0 +1,163 @@
+"""
+Módulo para processar vários conjuntos de dados de forma concorrente
+
+O agendamento é feito com asyncio. Cada conjunto é processado por inteiro (leitura do CSV,
+etapas e escrita das tabelas e gráficos, em generate_outputs.run) por um processo do pool,
+com no máximo cpu_workers execuções simultâneas. Como cada processo faz a sua E/S em
+sequência, no máximo cpu_workers conjuntos leem ou escrevem arquivos ao mesmo tempo. O
+andamento e os tempos de cada conjunto são reportados à medida que as execuções terminam.
+
+Uso (a partir da pasta do README):
+    python src/batch_runner.py assets/a.csv assets/b.csv --output-root outputs
+"""
+
+import argparse
+import asyncio
+import copy
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from config import load_config
+from generate_outputs import run
+from output_formats import write_json
+
+CPU_WORKERS = os.cpu_count() or 1  # Conjuntos processados ao mesmo tempo
+TIMINGS_FILENAME = "timings.json"
+
+
+def dataset_jobs(dataset_paths: list[str], output_root: str) -> list[tuple[str, str]]:
+    """
+    Associa cada conjunto de dados a um diretório de saída próprio (output_root/<nome do arquivo>)
+
+    @return: Lista de (caminho do CSV, diretório de saída)
+    """
+
+    jobs = []
+    output_dirs = set()
+    for dataset_path in dataset_paths:
+        name = os.path.splitext(os.path.basename(dataset_path))[0]
+        output_dir = os.path.join(output_root, name)
+        if output_dir in output_dirs:
+            raise ValueError(f"Dois conjuntos de dados gerariam saídas em {output_dir}")
+        output_dirs.add(output_dir)
+        jobs.append((dataset_path, output_dir))
+    return jobs
+
+
+async def process_dataset(
+    executor: ProcessPoolExecutor,
+    cpu_slots: asyncio.Semaphore,
+    dataset_path: str,
+    output_dir: str,
+    config: dict,
+) -> dict:
+    """
+    Processa um conjunto de dados: execução no pool e relatório de tempos
+
+    Erros não interrompem os demais conjuntos; eles são devolvidos no resultado.
+
+    @return: Dicionário com dataset, output_dir, bytes, timings (por etapa), total e error
+    """
+
+    result = {
+        "dataset": dataset_path,
+        "output_dir": output_dir,
+        "bytes": 0,
+        "timings": {},
+        "total": 0.0,
+        "error": None,
+    }
+    start = time.perf_counter()
+
+    try:
+        result["bytes"] = os.path.getsize(dataset_path)
+        async with cpu_slots:
+            result["timings"]["queued"] = time.perf_counter() - start
+
+            loop = asyncio.get_running_loop()
+            stage_timings = await loop.run_in_executor(executor, run, dataset_path, output_dir, config)
+            result["timings"].update(stage_timings)
+
+        result["total"] = time.perf_counter() - start
+        await asyncio.to_thread(
+            write_json, os.path.join(output_dir, TIMINGS_FILENAME), result["timings"]
+        )
+    except Exception as error:
+        result["error"] = f"{type(error).__name__}: {error}"
+        result["total"] = time.perf_counter() - start
+
+    return result
+
+
+def report_progress(done: int, total: int, result: dict) -> None:
+    """
+    Imprime uma linha com o resultado de um conjunto de dados
+    """
+
+    name = os.path.basename(result["dataset"])
+    if result["error"] is not None:
+        print(f"[{done}/{total}] {name}: falhou após {result['total']:.2f}s ({result['error']})")
+        return
+
+    stages = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in result["timings"].items())
+    print(f"[{done}/{total}] {name}: {result['total']:.2f}s ({stages})")
+
+
+async def run_datasets(
+    jobs: list[tuple[str, str]],
+    config: dict | None = None,
+    cpu_workers: int = CPU_WORKERS,
+    on_progress=report_progress,
+) -> list[dict]:
+    """
+    Processa vários conjuntos de dados de forma concorrente
+
+    @param jobs: Lista de (caminho do CSV, diretório de saída), ver dataset_jobs
+    @param config: Configuração do pipeline; se None, é lida de config.CONFIG_PATH
+    @param cpu_workers: Número máximo de conjuntos processados ao mesmo tempo
+    @param on_progress: Chamada com (concluídos, total, resultado) ao fim de cada conjunto
+
+    @return: Resultados de process_dataset, na ordem de jobs
+    """
+
+    config = copy.deepcopy(load_config() if config is None else config)
+    # O paralelismo é entre conjuntos; cada um é lido por um único processo
+    config["input"]["workers"] = 1
+
+    cpu_slots = asyncio.Semaphore(cpu_workers)
+
+    with ProcessPoolExecutor(max_workers=cpu_workers) as executor:
+        tasks = [
+            asyncio.create_task(
+                process_dataset(executor, cpu_slots, dataset_path, output_dir, config)
+            )
+            for dataset_path, output_dir in jobs
+        ]
+        for done, task in enumerate(asyncio.as_completed(tasks), start=1):
+            on_progress(done, len(tasks), await task)
+
+    return [task.result() for task in tasks]
+
+
+def main() -> None:
+    config = load_config()
+
+    parser = argparse.ArgumentParser(description="Gera as saídas de vários conjuntos de dados")
+    parser.add_argument("datasets", nargs="+", help="Caminhos dos CSVs")
+    parser.add_argument("--output-root", default=config["outputs"]["directory"],
+                        help="Diretório com uma subpasta de saídas por conjunto")
+    parser.add_argument("--cpu-workers", type=int, default=CPU_WORKERS)
+    args = parser.parse_args()
+
+    jobs = dataset_jobs(args.datasets, args.output_root)
+    start = time.perf_counter()
+    results = asyncio.run(run_datasets(jobs, config, args.cpu_workers))
+
+    failed = sum(result["error"] is not None for result in results)
+    print(f"{len(results) - failed} de {len(results)} conjuntos processados em "
+          f"{time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Módulo com as estratégias de divisão em classes das variáveis quantitativas
+
+Todas as estratégias partem da mesma coluna ordenada (valores e frequências acumuladas),
+de modo que a ordenação é feita uma única vez por variável.
+"""
+
+import numpy as np
+
+
+def sturges_rule(n: int) -> int:
+    """
+    Regra de Sturges para determinar o número de classes de uma variável quantitativa
+
+    @param n: Número total de observações
+    """
+
+    return int(np.ceil(1 + 3.322 * np.log10(n)))
+
+
+def sort_weighted_values(values: list[tuple]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Ordena os pares (valor, frequência) e calcula as frequências acumuladas.
+
+    @param values: Lista de tuplas (valor_numérico, frequência)
+    @return: Tupla (valores_ordenados, frequências_acumuladas)
+    """
+
+    val_nums = np.array([val for val, _ in values], dtype=float)
+    freqs = np.array([freq for _, freq in values], dtype=np.int64)
+
+    order = np.argsort(val_nums, kind="stable")
+    return val_nums[order], np.cumsum(freqs[order])
+
+
+def weighted_quantiles(sorted_vals: np.ndarray, cum_weights: np.ndarray, q) -> np.ndarray:
+    """
+    Calcula quantis de uma coluna ordenada com frequências (sem interpolação).
+
+    @param sorted_vals: Valores ordenados
+    @param cum_weights: Frequências acumuladas correspondentes
+    @param q: Quantil ou lista de quantis entre 0 e 1
+    """
+
+    total = cum_weights[-1]
+    positions = np.ceil(np.asarray(q, dtype=float) * total)
+    indexes = np.searchsorted(cum_weights, np.maximum(positions, 1), side="left")
+    return sorted_vals[np.minimum(indexes, len(sorted_vals) - 1)]
+
+
+def weighted_std(sorted_vals: np.ndarray, cum_weights: np.ndarray) -> float:
+    """
+    Desvio padrão populacional de uma coluna com frequências.
+    """
+
+    weights = np.diff(cum_weights, prepend=0)
+    mean = np.average(sorted_vals, weights=weights)
+    return float(np.sqrt(np.average((sorted_vals - mean) ** 2, weights=weights)))
+
+
+def bins_from_width(sorted_vals: np.ndarray, width: float, fallback: int) -> int:
+    """
+    Converte uma largura de classe no número de classes que cobre a amplitude dos dados.
+
+    @param fallback: Número de classes usado quando a largura é nula (dados concentrados)
+    """
+
+    data_range = sorted_vals[-1] - sorted_vals[0]
+    if width <= 0 or data_range <= 0:
+        return fallback
+    return max(1, int(np.ceil(data_range / width)))
+
+
+def sturges_bins(sorted_vals: np.ndarray, cum_weights: np.ndarray) -> int:
+    """
+    Número de classes pela regra de Sturges.
+    """
+
+    return sturges_rule(int(cum_weights[-1]))
+
+
+def freedman_diaconis_bins(sorted_vals: np.ndarray, cum_weights: np.ndarray) -> int:
+    """
+    Número de classes pela regra de Freedman–Diaconis (largura = 2 * IQR * n^(-1/3)).
+    """
+
+    n = int(cum_weights[-1])
+    q1, q3 = weighted_quantiles(sorted_vals, cum_weights, [0.25, 0.75])
+    width = 2 * (q3 - q1) * n ** (-1 / 3)
+    return bins_from_width(sorted_vals, width, sturges_rule(n))
+
+
+def scott_bins(sorted_vals: np.ndarray, cum_weights: np.ndarray) -> int:
+    """
+    Número de classes pela regra de Scott (largura = 3.49 * desvio padrão * n^(-1/3)).
+    """
+
+    n = int(cum_weights[-1])
+    width = 3.49 * weighted_std(sorted_vals, cum_weights) * n ** (-1 / 3)
+    return bins_from_width(sorted_vals, width, sturges_rule(n))
+
+
+def linear_edges(sorted_vals: np.ndarray, cum_weights: np.ndarray, nbins: int) -> np.ndarray:
+    """
+    Bordas igualmente espaçadas entre o mínimo e o máximo.
+    """
+
+    return np.linspace(sorted_vals[0], sorted_vals[-1], nbins + 1)
+
+
+def quantile_edges(sorted_vals: np.ndarray, cum_weights: np.ndarray, nbins: int) -> np.ndarray:
+    """
+    Bordas de mesma frequência (cada classe recebe aproximadamente n / nbins observações).
+
+    Bordas repetidas, comuns em dados discretos, são removidas.
+    """
+
+    edges = weighted_quantiles(sorted_vals, cum_weights, np.linspace(0, 1, nbins + 1))
+    edges[0], edges[-1] = sorted_vals[0], sorted_vals[-1]
+    return np.unique(edges)
+
+
+def log_edges(sorted_vals: np.ndarray, cum_weights: np.ndarray, nbins: int) -> np.ndarray:
+    """
+    Bordas igualmente espaçadas em escala logarítmica, adequadas a contagens de cauda pesada.
+
+    Valores menores que 1 são agrupados na primeira classe. Para dados inteiros, as bordas
+    são arredondadas e as repetidas removidas.
+    """
+
+    low = max(sorted_vals[0], 1.0)
+    high = max(sorted_vals[-1], low)
+    edges = np.geomspace(low, high, nbins + 1)
+    if np.all(sorted_vals == np.round(sorted_vals)):
+        edges = np.round(edges)
+    edges[0], edges[-1] = sorted_vals[0], sorted_vals[-1]
+    return np.unique(edges)
+
+
+# Mapeia nome da estratégia -> (função que define o número de classes, função que cria as bordas)
+BINNING_STRATEGIES = {
+    "sturges": (sturges_bins, linear_edges),
+    "freedman_diaconis": (freedman_diaconis_bins, linear_edges),
+    "scott": (scott_bins, linear_edges),
+    "quantile": (sturges_bins, quantile_edges),
+    "log": (sturges_bins, log_edges),
+}
+
+
+def compute_bin_count(strategy: str, sorted_vals: np.ndarray, cum_weights: np.ndarray) -> int:
+    """
+    Determina o número de classes segundo a estratégia escolhida.
+
+    @param strategy: Nome da estratégia (chave de BINNING_STRATEGIES)
+    @param sorted_vals: Valores ordenados
+    @param cum_weights: Frequências acumuladas correspondentes
+    """
+
+    if strategy not in BINNING_STRATEGIES:
+        raise ValueError(
+            f"Estratégia de classes desconhecida: {strategy}. "
+            f"Opções: {', '.join(BINNING_STRATEGIES)}"
+        )
+    bins_function, _ = BINNING_STRATEGIES[strategy]
+    return bins_function(sorted_vals, cum_weights)
+
+
+def compute_bin_edges(strategy: str, sorted_vals: np.ndarray, cum_weights: np.ndarray) -> np.ndarray:
+    """
+    Cria as bordas das classes segundo a estratégia escolhida.
+
+    @param strategy: Nome da estratégia (chave de BINNING_STRATEGIES)
+    @param sorted_vals: Valores ordenados
+    @param cum_weights: Frequências acumuladas correspondentes
+
+    @return: Array crescente com pelo menos duas bordas (o número de classes é len(bordas) - 1)
+    """
+
+    nbins = compute_bin_count(strategy, sorted_vals, cum_weights)
+    _, edges_function = BINNING_STRATEGIES[strategy]
+    edges = edges_function(sorted_vals, cum_weights, nbins)
+
+    # Para dados inteiros (ex.: número de resenhas), as bordas também são inteiras, para que
+    # os rótulos "início - fim" de cada classe não fiquem invertidos
+    if np.all(sorted_vals == np.round(sorted_vals)):
+        edges = np.ceil(edges)
+    edges = np.unique(edges)
+
+    # Com um único valor distinto, ainda há uma classe [valor, valor]
+    if len(edges) < 2:
+        edges = np.repeat(edges, 2)
+    return edges
+
+
+def count_in_bins(sorted_vals: np.ndarray, cum_weights: np.ndarray, edges) -> list[int]:
+    """
+    Conta as observações de cada classe [borda_i, borda_i+1), com a última classe fechada.
+
+    @param sorted_vals: Valores ordenados
+    @param cum_weights: Frequências acumuladas correspondentes
+    @param edges: Bordas das classes
+
+    @return: Lista com as frequências de cada classe
+    """
+
+    edges = np.asarray(edges, dtype=float)
+    # Posição de cada borda interna; a última classe inclui o valor máximo
+    positions = np.searchsorted(sorted_vals, edges[1:-1], side="left")
+    cum = np.concatenate(([0], cum_weights))
+    boundaries = np.concatenate(([0], positions, [len(sorted_vals)]))
+    return np.diff(cum[boundaries]).astype(int).tolist()
@@ -0,0 +1,313 @@
+"""
+Módulo para a configuração do pipeline (arquivo TOML)
+
+O arquivo descreve a entrada, as variáveis, as etapas (tabelas, medidas de resumo,
+gráficos e relações entre variáveis) e os formatos de saída. Chaves ausentes assumem
+os valores de DEFAULT_CONFIG. A partir da configuração, plan_columns decide quais
+colunas do CSV precisam ser lidas: o que nenhuma etapa ativa usa não é carregado.
+"""
+
+import copy
+import os
+import tomllib
+
+from binning import BINNING_STRATEGIES
+from dates import PARTIAL_DATE_POLICIES, PARTIAL_DATE_POLICY
+from multiple_comparisons import CORRECTIONS
+from output_formats import FIGURE_FORMATS, TABLE_WRITERS
+from records import (
+    MULTI_VALUE_COLUMNS,
+    READER,
+    READERS,
+    RELEASE_DTYPE,
+    TOKEN_COLUMNS,
+    ReleaseRecords,
+    load_records,
+)
+
+CONFIG_PATH = "pipeline.toml"
+STAGES = [
+    "frequency_tables", "summary_statistics", "robust_statistics", "hypothesis_tests", "contingency",
+    "graphs", "relationships",
+]
+# Variáveis aceitas pelas medidas robustas (as que têm valores numéricos por lançamento)
+ROBUST_VARIABLES = ["avg_rating", "review_count"]
+
+# Gráficos de relação entre variáveis -> colunas que cada um usa
+RELATIONSHIP_PLOTS = {
+    "rating_vs_reviews": ["review_count", "avg_rating"],
+    "rating_vs_date": ["release_date", "avg_rating"],
+    "genre_means": ["primary_genres", "avg_rating"],
+    "descriptor_means": ["descriptors", "avg_rating"],
+    "descriptors_by_decade": ["descriptors", "release_date"],
+}
+# Os boxplots usam a média das avaliações, por gênero primário e por década
+BOXPLOT_COLUMNS = ["avg_rating", "primary_genres", "release_date"]
+
+DEFAULT_CONFIG = {
+    "input": {
+        "path": "assets/rym_clean1.csv",
+        "partial_dates": PARTIAL_DATE_POLICY,
+        "reader": READER,
+        "workers": 0,  # 0 = número de núcleos
+    },
+    "variables": {
+        "qualitative": ["artist_name", "primary_genres", "descriptors"],
+        "quantitative": ["release_date", "avg_rating", "review_count"],
+    },
+    "frequency_tables": {
+        "enabled": True,
+        "size_limit": 15,
+        # O número de resenhas tem cauda pesada, então usa classes em escala logarítmica
+        "binning": {"release_date": "sturges", "avg_rating": "sturges", "review_count": "log"},
+        "kde": ["release_date", "avg_rating"],
+        "kde_grid_size": 512,
+    },
+    "summary_statistics": {
+        "enabled": True,
+        "boxplots": True,
+        "boxplot_min_count": 100,
+        "boxplot_top_genres": 10,
+    },
+    "robust_statistics": {
+        "enabled": True,
+        "variables": ["review_count", "avg_rating"],
+        "trim_proportion": 0.1,
+        "iqr_factor": 1.5,
+        "zscore_threshold": 3.0,
+    },
+    "hypothesis_tests": {
+        "enabled": True,
+        "columns": ["primary_genres", "descriptors"],
+        "min_count": 100,
+        "max_groups": 0,  # 0 = todos os valores frequentes
+        "correction": "holm",
+        "alpha": 0.05,
+    },
+    "contingency": {
+        "enabled": True,
+        "columns": ["descriptors", "primary_genres"],
+        "min_expected": 5.0,
+        "residual_threshold": 3.0,
+        "top_n": 10,
+    },
+    "graphs": {
+        "enabled": True,
+    },
+    "relationships": {
+        "enabled": True,
+        "plots": list(RELATIONSHIP_PLOTS),
+        "min_count": 100,
+        "top_n": 10,
+        "density_threshold": 100_000,
+        "density_grid_size": 100,
+        "density_log_reviews": False,
+    },
+    "outputs": {
+        "directory": "outputs",
+        "figure_formats": ["png"],
+        "figure_dpi": 300,
+        "previews": False,
+        "preview_dpi": 100,
+        "table_formats": ["csv"],
+    },
+}
+
+
+def merge_config(defaults: dict, overrides: dict, section: str = "") -> dict:
+    """
+    Sobrepõe as chaves do arquivo aos valores padrão, seção a seção
+
+    Chaves desconhecidas ou com tipo diferente do padrão geram ValueError; a exceção são
+    inteiros em chaves float, que são convertidos.
+
+    @param defaults: Valores padrão da seção
+    @param overrides: Valores lidos do arquivo para a seção
+    @param section: Nome da seção (usado nas mensagens de erro)
+    """
+
+    merged = copy.deepcopy(defaults)
+    for key, value in overrides.items():
+        name = f"{section}.{key}" if section else key
+        if key not in defaults:
+            raise ValueError(f"Chave desconhecida na configuração: {name}")
+
+        default = defaults[key]
+        if isinstance(default, dict) and not isinstance(value, dict):
+            raise ValueError(f"{name} deve ser uma seção")
+        if key == "binning":
+            # As chaves da seção de classes são as próprias variáveis
+            merged[key].update(value)
+        elif isinstance(default, dict):
+            merged[key] = merge_config(default, value, name)
+        elif type(default) is float and type(value) is int:
+            # O TOML distingue 3 de 3.0; inteiros valem onde se espera um float (booleanos, não)
+            merged[key] = float(value)
+        elif type(value) is not type(default):
+            raise ValueError(
+                f"{name} deve ser do tipo {type(default).__name__}, não {type(value).__name__}"
+            )
+        else:
+            merged[key] = value
+    return merged
+
+
+def validate_config(config: dict) -> None:
+    """
+    Verifica se os nomes de variáveis, estratégias e opções existem
+    """
+
+    input_options = config["input"]
+    if input_options["partial_dates"] not in PARTIAL_DATE_POLICIES:
+        raise ValueError(
+            f"input.partial_dates deve ser uma de: {', '.join(PARTIAL_DATE_POLICIES)}"
+        )
+    if input_options["reader"] not in READERS:
+        raise ValueError(f"input.reader deve ser um de: {', '.join(READERS)}")
+
+    variables = config["variables"]
+    quantitative_columns = [name for name in RELEASE_DTYPE.names if name != "release_id"]
+    for key, known in (("qualitative", TOKEN_COLUMNS), ("quantitative", quantitative_columns)):
+        unknown = set(variables[key]).difference(known)
+        if unknown:
+            raise ValueError(
+                f"variables.{key} contém variáveis desconhecidas: {', '.join(sorted(unknown))}"
+            )
+
+    tables = config["frequency_tables"]
+    unknown = set(tables["binning"]).difference(quantitative_columns)
+    if unknown:
+        raise ValueError(
+            f"frequency_tables.binning contém variáveis desconhecidas: {', '.join(sorted(unknown))}. "
+            f"Opções: {', '.join(quantitative_columns)}"
+        )
+    for variable, strategy in tables["binning"].items():
+        if strategy not in BINNING_STRATEGIES:
+            raise ValueError(
+                f"frequency_tables.binning.{variable}: estratégia desconhecida {strategy}. "
+                f"Opções: {', '.join(BINNING_STRATEGIES)}"
+            )
+    unknown = set(tables["kde"]).difference(quantitative_columns)
+    if unknown:
+        raise ValueError(f"frequency_tables.kde contém variáveis desconhecidas: {', '.join(sorted(unknown))}")
+
+    robust = config["robust_statistics"]
+    unknown = set(robust["variables"]).difference(ROBUST_VARIABLES)
+    if unknown:
+        raise ValueError(
+            f"robust_statistics.variables contém variáveis não suportadas: {', '.join(sorted(unknown))}. "
+            f"Opções: {', '.join(ROBUST_VARIABLES)}"
+        )
+    if not 0 <= robust["trim_proportion"] < 0.5:
+        raise ValueError("robust_statistics.trim_proportion deve estar entre 0 e 0.5")
+
+    tests = config["hypothesis_tests"]
+    unknown = set(tests["columns"]).difference(MULTI_VALUE_COLUMNS)
+    if unknown:
+        raise ValueError(
+            f"hypothesis_tests.columns contém variáveis não suportadas: {', '.join(sorted(unknown))}. "
+            f"Opções: {', '.join(MULTI_VALUE_COLUMNS)}"
+        )
+    if tests["correction"] not in CORRECTIONS:
+        raise ValueError(f"hypothesis_tests.correction deve ser uma de: {', '.join(CORRECTIONS)}")
+    if tests["min_count"] < 2:
+        raise ValueError("hypothesis_tests.min_count deve ser pelo menos 2")
+
+    unknown = set(config["contingency"]["columns"]).difference(TOKEN_COLUMNS)
+    if unknown:
+        raise ValueError(
+            f"contingency.columns contém variáveis desconhecidas: {', '.join(sorted(unknown))}. "
+            f"Opções: {', '.join(TOKEN_COLUMNS)}"
+        )
+
+    unknown = set(config["relationships"]["plots"]).difference(RELATIONSHIP_PLOTS)
+    if unknown:
+        raise ValueError(
+            f"relationships.plots contém gráficos desconhecidos: {', '.join(sorted(unknown))}. "
+            f"Opções: {', '.join(RELATIONSHIP_PLOTS)}"
+        )
+
+    outputs = config["outputs"]
+    for key, known in (("figure_formats", FIGURE_FORMATS), ("table_formats", TABLE_WRITERS)):
+        unknown = set(outputs[key]).difference(known)
+        if unknown:
+            raise ValueError(
+                f"outputs.{key} contém formatos desconhecidos: {', '.join(sorted(unknown))}. "
+                f"Opções: {', '.join(known)}"
+            )
+
+
+def load_config(path: str = CONFIG_PATH) -> dict:
+    """
+    Lê a configuração do pipeline; se o arquivo não existir, usa DEFAULT_CONFIG
+
+    @param path: Caminho do arquivo TOML
+    """
+
+    overrides = {}
+    if os.path.exists(path):
+        with open(path, "rb") as file:
+            overrides = tomllib.load(file)
+
+    config = merge_config(DEFAULT_CONFIG, overrides)
+    validate_config(config)
+    return config
+
+
+def plan_columns(config: dict, stages: list[str] = STAGES) -> list[str]:
+    """
+    Decide quais colunas do CSV as etapas ativas usam
+
+    @param config: Configuração do pipeline
+    @param stages: Etapas consideradas (as desativadas na configuração são ignoradas)
+
+    @return: Colunas a carregar, sem repetição
+    """
+
+    variables = config["variables"]
+    columns = []
+
+    if "frequency_tables" in stages and config["frequency_tables"]["enabled"]:
+        columns += variables["qualitative"] + variables["quantitative"]
+        columns += config["frequency_tables"]["kde"]
+
+    if "summary_statistics" in stages and config["summary_statistics"]["enabled"]:
+        columns += variables["qualitative"] + variables["quantitative"]
+        if config["summary_statistics"]["boxplots"]:
+            columns += BOXPLOT_COLUMNS
+
+    if "robust_statistics" in stages and config["robust_statistics"]["enabled"]:
+        # Os ids permitem listar os lançamentos sinalizados como outliers
+        columns += config["robust_statistics"]["variables"] + ["release_id"]
+
+    if "hypothesis_tests" in stages and config["hypothesis_tests"]["enabled"]:
+        columns += config["hypothesis_tests"]["columns"] + ["avg_rating"]
+
+    if "contingency" in stages and config["contingency"]["enabled"]:
+        columns += config["contingency"]["columns"] + ["release_date"]
+
+    # Os gráficos das variáveis são feitos a partir das tabelas já salvas pelas etapas
+    # frequency_tables e summary_statistics, sem ler o CSV
+    if "relationships" in stages and config["relationships"]["enabled"]:
+        for plot in config["relationships"]["plots"]:
+            columns += RELATIONSHIP_PLOTS[plot]
+
+    return list(dict.fromkeys(columns))
+
+
+def load_planned_records(config: dict, stages: list[str] = STAGES) -> ReleaseRecords:
+    """
+    Lê do CSV apenas as colunas usadas pelas etapas
+
+    @param config: Configuração do pipeline
+    @param stages: Etapas que vão usar os registros
+    """
+
+    input_options = config["input"]
+    return load_records(
+        input_options["path"],
+        input_options["partial_dates"],
+        workers=input_options["workers"] or os.cpu_count() or 1,
+        reader=input_options["reader"],
+        columns=plan_columns(config, stages),
+    )
@@ -0,0 +1,201 @@
+"""
+Módulo com a análise de contingência (qui-quadrado) das variáveis qualitativas por década
+
+A tabela valor x década é acumulada de forma esparsa: cada ocorrência datada vira a chave
+id * décadas + década, e np.unique devolve apenas as células não nulas com suas contagens
+(nunca existe a tabela densa, que teria milhares de linhas para os descritores). Como os
+totais observados e esperados são iguais a N, o qui-quadrado da tabela inteira é
+Σ (O - E)² / E = Σ_não nulas O² / E - N, somando apenas as células não nulas.
+"""
+
+import numpy as np
+from scipy import special
+
+from config import load_config, load_planned_records
+from dates import date_years
+from frequency_tables import translation
+from output_formats import save_table
+from records import ReleaseRecords
+
+
+def sparse_contingency(row_ids: np.ndarray, column_ids: np.ndarray, n_columns: int):
+    """
+    Acumula as contagens das células não nulas de uma tabela de contingência
+
+    @param row_ids: Linha (valor da variável) de cada ocorrência
+    @param column_ids: Coluna (década) de cada ocorrência, entre 0 e n_columns - 1
+    @param n_columns: Número de colunas
+
+    @return: Tupla (linhas, colunas, contagens) das células não nulas
+    """
+
+    keys, counts = np.unique(row_ids.astype(np.int64) * n_columns + column_ids, return_counts=True)
+    return keys // n_columns, keys % n_columns, counts
+
+
+def chi_square_test(
+    rows: np.ndarray, columns: np.ndarray, observed: np.ndarray, row_totals: np.ndarray,
+    column_totals: np.ndarray,
+) -> dict:
+    """
+    Teste qui-quadrado de independência e V de Cramér a partir das células não nulas
+
+    Linhas e colunas sem nenhuma ocorrência não entram nos graus de liberdade.
+
+    @param rows: Linha de cada célula não nula
+    @param columns: Coluna de cada célula não nula
+    @param observed: Contagem de cada célula não nula
+    @param row_totals: Total de cada linha
+    @param column_totals: Total de cada coluna
+
+    @return: Dicionário com o qui-quadrado, os graus de liberdade, o p-valor, o V de Cramér
+        e as frequências esperadas das células não nulas
+    """
+
+    total = observed.sum()
+    expected = row_totals[rows] * column_totals[columns] / total
+    statistic = max(float(np.sum(observed ** 2 / expected) - total), 0.0)
+
+    n_rows = int(np.count_nonzero(row_totals))
+    n_columns = int(np.count_nonzero(column_totals))
+    df = (n_rows - 1) * (n_columns - 1)
+    smaller_side = min(n_rows, n_columns) - 1
+
+    return {
+        "statistic": statistic,
+        "df": df,
+        "p_value": float(special.chdtrc(df, statistic)) if df > 0 else 1.0,
+        "cramers_v": float(np.sqrt(statistic / (total * smaller_side))) if smaller_side > 0 else 0.0,
+        "rows": n_rows,
+        "columns": n_columns,
+        "total": int(total),
+        "expected": expected,
+    }
+
+
+def standardized_residuals(
+    rows: np.ndarray, columns: np.ndarray, observed: np.ndarray, expected: np.ndarray,
+    row_totals: np.ndarray, column_totals: np.ndarray,
+):
+    """
+    Resíduos de Pearson (O - E) / √E e resíduos ajustados, que dividem também por
+    √((1 - total da linha / N) (1 - total da coluna / N)) e seguem aproximadamente
+    uma normal padrão sob independência
+
+    @return: Tupla (resíduos de Pearson, resíduos ajustados) das células não nulas
+    """
+
+    total = observed.sum()
+    pearson = (observed - expected) / np.sqrt(expected)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        adjusted = pearson / np.sqrt(
+            (1 - row_totals[rows] / total) * (1 - column_totals[columns] / total)
+        )
+    return pearson, adjusted
+
+
+def top_cells_per_column(columns: np.ndarray, scores: np.ndarray, eligible: np.ndarray, top_n: int) -> np.ndarray:
+    """
+    Índices das top_n células de maior escore em cada coluna, entre as elegíveis
+
+    @return: Índices ordenados por coluna e, dentro dela, por escore decrescente
+    """
+
+    candidates = np.flatnonzero(eligible)
+    order = candidates[np.lexsort((-scores[candidates], columns[candidates]))]
+    ordered_columns = columns[order]
+    # Posição de cada célula dentro da sua coluna (0 para a de maior escore)
+    starts = np.flatnonzero(np.r_[True, ordered_columns[1:] != ordered_columns[:-1]])
+    run_lengths = np.diff(np.r_[starts, len(order)])
+    position_in_column = np.arange(len(order)) - np.repeat(starts, run_lengths)
+    return order[position_in_column < top_n]
+
+
+def decade_contingency(records: ReleaseRecords, column: str, options: dict):
+    """
+    Analisa a tabela de contingência valor x década de uma variável qualitativa
+
+    @param records: Registros dos lançamentos
+    @param column: Variável qualitativa (primary_genres ou descriptors)
+    @param options: Seção [contingency] da configuração
+
+    @return: Tupla (tabela do teste, tabela dos valores sobre-representados por década),
+        ou None se não houver ocorrências datadas
+    """
+
+    tokens = records[column]
+    release_dates = records["release_date"][tokens.row_index()]
+    has_date = ~np.isnat(release_dates)
+    if not has_date.any():
+        return None
+
+    decade_values, decade_ids = np.unique(
+        date_years(release_dates[has_date]) // 10 * 10, return_inverse=True
+    )
+    token_ids = tokens.ids[has_date]
+
+    rows, columns, observed = sparse_contingency(token_ids, decade_ids.ravel(), len(decade_values))
+    row_totals = np.bincount(rows, weights=observed, minlength=len(tokens.vocabulary))
+    column_totals = np.bincount(columns, weights=observed, minlength=len(decade_values))
+    observed = observed.astype(float)
+
+    test = chi_square_test(rows, columns, observed, row_totals, column_totals)
+    pearson, adjusted = standardized_residuals(
+        rows, columns, observed, test["expected"], row_totals, column_totals
+    )
+
+    test_table = {
+        "Qui-quadrado": [test["statistic"]],
+        "Graus de liberdade": [test["df"]],
+        "p-valor": [test["p_value"]],
+        "V de Cramér": [test["cramers_v"]],
+        translation[column]: [test["rows"]],
+        "Décadas": [test["columns"]],
+        "Ocorrências": [test["total"]],
+        "Células não nulas": [len(observed)],
+    }
+
+    # Sobre-representados: resíduo ajustado acima do limite, com frequência esperada suficiente
+    eligible = (
+        (adjusted > options["residual_threshold"])
+        & (test["expected"] >= options["min_expected"])
+    )
+    selected = top_cells_per_column(columns, adjusted, eligible, options["top_n"])
+    residuals_table = {
+        "Década": [f"{decade}s" for decade in decade_values[columns[selected]].tolist()],
+        translation[column]: [tokens.vocabulary[token_id] for token_id in rows[selected].tolist()],
+        "Observado": observed[selected].astype(int).tolist(),
+        "Esperado": np.round(test["expected"][selected], 2).tolist(),
+        "Resíduo de Pearson": np.round(pearson[selected], 3).tolist(),
+        "Resíduo ajustado": np.round(adjusted[selected], 3).tolist(),
+    }
+    return test_table, residuals_table
+
+
+def get_contingency_analysis(records: ReleaseRecords | None = None, config: dict | None = None) -> None:
+    """
+    Executa a análise de contingência por década das colunas em contingency.columns e salva
+    as tabelas <variável>_por_decada_qui_quadrado e <variável>_por_decada_residuos no
+    diretório de saída
+
+    @param records: Registros dos lançamentos; se None, são lidos do CSV
+    @param config: Configuração do pipeline; se None, é lida de config.CONFIG_PATH
+    """
+
+    if config is None:
+        config = load_config()
+    if records is None:
+        records = load_planned_records(config, ["contingency"])
+    options = config["contingency"]
+
+    for column in options["columns"]:
+        tables = decade_contingency(records, column, options)
+        if tables is None:
+            continue
+        test_table, residuals_table = tables
+        save_table(f"{translation[column]}_por_decada_qui_quadrado", test_table, config["outputs"])
+        save_table(f"{translation[column]}_por_decada_residuos", residuals_table, config["outputs"])
+
+
+if __name__ == "__main__":
+    get_contingency_analysis()
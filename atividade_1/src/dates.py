@@ -0,0 +1,160 @@
+"""
+Módulo para o tratamento vetorizado das datas de lançamento
+
+As datas são convertidas em bloco para datetime64[D]. A divisão em classes e os rótulos
+trabalham com o número de dias desde 1970-01-01 (inteiros), sem objetos datetime.
+"""
+
+import numpy as np
+
+# Política para datas parciais (só ano, "1997", ou ano e mês, "1997-06"):
+#   "start": primeiro dia do período (1997-01-01, 1997-06-01)
+#   "middle": meio do período (1997-07-01, 1997-06-15)
+#   "drop": descarta a data (NaT)
+PARTIAL_DATE_POLICIES = ("start", "middle", "drop")
+PARTIAL_DATE_POLICY = "start"
+
+
+def matches_pattern(values: np.ndarray, pattern: str) -> np.ndarray:
+    """
+    Indica quais textos seguem o padrão, em que "9" é um dígito ASCII e os demais caracteres
+    são literais (ex.: "9999-99" para AAAA-MM)
+
+    A comparação é feita sobre os códigos dos caracteres, sem expressões regulares.
+
+    @param values: Array de textos com exatamente len(pattern) caracteres
+    @param pattern: Padrão esperado
+    """
+
+    codes = values.astype(f"U{len(pattern)}").view(np.uint32).reshape(len(values), len(pattern))
+    matches = np.ones(len(values), dtype=bool)
+    for position, expected in enumerate(pattern):
+        column = codes[:, position]
+        if expected == "9":
+            matches &= (column >= ord("0")) & (column <= ord("9"))
+        else:
+            matches &= column == ord(expected)
+    return matches
+
+
+def cast_dates(values: np.ndarray, pattern: str, unit: str) -> np.ndarray:
+    """
+    Converte para datetime64[unit] os textos de um mesmo comprimento
+
+    Os que não seguem o padrão (ex.: "abcd") ou não são datas do calendário
+    (ex.: "1997-13-01") viram NaT.
+
+    @param values: Array de textos com exatamente len(pattern) caracteres
+    @param pattern: Padrão esperado (ver matches_pattern)
+    @param unit: Unidade do datetime64 ("Y", "M" ou "D")
+    """
+
+    dates = np.full(values.shape, np.datetime64("NaT"), dtype=f"datetime64[{unit}]")
+    valid = matches_pattern(values, pattern)
+    try:
+        dates[valid] = values[valid].astype(f"datetime64[{unit}]")
+    except ValueError:
+        # Algum valor tem o formato certo, mas não é uma data: converte cada valor distinto
+        distinct, inverse = np.unique(values[valid], return_inverse=True)
+        parsed = np.full(distinct.shape, np.datetime64("NaT"), dtype=f"datetime64[{unit}]")
+        for i, value in enumerate(distinct.tolist()):
+            try:
+                parsed[i] = np.datetime64(value, unit)
+            except ValueError:
+                pass
+        dates[valid] = parsed[inverse.ravel()]
+    return dates
+
+
+def parse_dates(values, policy: str = PARTIAL_DATE_POLICY) -> np.ndarray:
+    """
+    Converte datas ISO (AAAA-MM-DD, AAAA-MM ou AAAA) para datetime64[D] de uma só vez
+
+    Valores em outro formato (ex.: "NA", "Unknown") ou que não são datas do calendário
+    (ex.: "1997-13-01") viram NaT.
+
+    @param values: Sequência de textos com as datas
+    @param policy: Tratamento das datas parciais (ver PARTIAL_DATE_POLICIES)
+    """
+
+    if policy not in PARTIAL_DATE_POLICIES:
+        raise ValueError(
+            f"Política de datas parciais desconhecida: {policy}. "
+            f"Opções: {', '.join(PARTIAL_DATE_POLICIES)}"
+        )
+
+    values = np.asarray(values, dtype=str)
+    lengths = np.char.str_len(values)
+    dates = np.full(values.shape, np.datetime64("NaT"), dtype="datetime64[D]")
+
+    full = lengths == 10
+    dates[full] = cast_dates(values[full], "9999-99-99", "D")
+
+    if policy == "drop":
+        return dates
+
+    year_only = lengths == 4
+    year_month = lengths == 7
+    years = cast_dates(values[year_only], "9999", "Y").astype("datetime64[M]")
+    months = cast_dates(values[year_month], "9999-99", "M").astype("datetime64[D]")
+
+    if policy == "middle":
+        years = years + 6
+        months = months + 14
+
+    dates[year_only] = years.astype("datetime64[D]")
+    dates[year_month] = months
+    return dates
+
+
+def date_offsets(dates: np.ndarray) -> np.ndarray:
+    """
+    Número de dias desde 1970-01-01 de cada data válida (as NaT são descartadas)
+    """
+
+    return dates[~np.isnat(dates)].astype(np.int64)
+
+
+def date_years(dates: np.ndarray) -> np.ndarray:
+    """
+    Ano de cada data (as datas devem ser válidas)
+    """
+
+    return dates.astype("datetime64[Y]").astype(np.int64) + 1970
+
+
+def offsets_to_strings(offsets) -> np.ndarray:
+    """
+    Converte números de dias em textos AAAA-MM-DD
+    """
+
+    return np.datetime_as_string(np.asarray(offsets, dtype=np.int64).astype("datetime64[D]"), unit="D")
+
+
+def date_bin_edges(min_day: int, max_day: int, nbins: int) -> np.ndarray:
+    """
+    Cria as bordas inteiras (em dias) de nbins classes [borda_i, borda_i+1)
+
+    A última borda é max_day + 1, para que a data máxima fique na última classe. Se o
+    intervalo tiver menos dias que nbins, cada classe fica com um único dia.
+
+    @param min_day: Menor data, em dias
+    @param max_day: Maior data, em dias
+    @param nbins: Número de classes
+    """
+
+    span = max_day + 1 - min_day
+    # Com mais classes que dias, as bordas se repetiriam e as classes ficariam invertidas
+    nbins = min(nbins, span)
+    return min_day + (span * np.arange(nbins + 1)) // nbins
+
+
+def date_class_labels(bin_edges: np.ndarray) -> list[str]:
+    """
+    Cria os rótulos "início - fim" de cada classe, com o fim um dia antes da borda seguinte
+    """
+
+    bin_edges = np.asarray(bin_edges, dtype=np.int64)
+    starts = offsets_to_strings(bin_edges[:-1])
+    ends = offsets_to_strings(bin_edges[1:] - 1)
+    return np.char.add(np.char.add(starts, " - "), ends).tolist()
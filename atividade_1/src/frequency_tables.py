@@ -2,21 +2,24 @@
 Módulo para construção das tabelas de frequência
 """
 
-import csv
 import os
-from datetime import datetime, timedelta
-from typing import Iterable
 
 import numpy as np
-import pandas as pd
-
-TABLE_SIZE_LIMIT = 15
-qualitative_vars = ["artist_name", "primary_genres", "descriptors"]
-quantitative_vars = ["release_date", "avg_rating", "review_count"]
-data: dict[str, set[str]] = {
-    column: set() for column in (qualitative_vars + quantitative_vars)
-}  # Mapeia coluna -> conjunto de dados lidos
-data_occurences: dict[str, int] = {}  # Mapeia dado -> número de ocorrências
+
+from binning import (
+    BINNING_STRATEGIES,
+    compute_bin_count,
+    compute_bin_edges,
+    count_in_bins,
+    linear_edges,
+    sort_weighted_values,
+)
+from dates import date_bin_edges, date_class_labels, date_offsets, offsets_to_strings
+from config import load_config, load_planned_records
+from kde import fft_kde
+from output_formats import output_path, save_table, write_json
+from records import ReleaseRecords
+
 translation = {
     "artist_name": "Nome do artista",
     "primary_genres": "Gêneros primários",
@@ -27,196 +30,116 @@ translation = {
 }
 
 
-def get_column_numbers(reader: Iterable[list[str]], variables: list) -> dict[str, int]:
-    """
-    Função que dinamicamente obtém os números das colunas relevantes
-
-    @param reader: Objeto CSV reader
-    @param variables: Lista de variáveis cujas colunas queremos mapear
-    """
-
-    column_numbers = {}  # Mapeia nome da coluna -> número da coluna
-    for i, column in enumerate(next(reader)):
-        if column in variables:
-            column_numbers[column] = i
-    return column_numbers
-
-
-def sturges_rule(n: int) -> int:
-    """
-    Regra de Sturges para determinar o número de classes de uma variável quantitativa
-
-    @param n: Número total de observações
-    """
-
-    return int(np.ceil(1 + 3.322 * np.log10(n)))
-
-
-def get_csv_data() -> None:
-    """
-    Função que lê o arquivo CSV e armazena os dados relevantes nos dicionários (data e data_occurences)
-    """
-
-    with open("assets/rym_clean1.csv", "r") as file:
-        reader = csv.reader(file)
-        column_numbers = get_column_numbers(
-            reader=reader, variables=(qualitative_vars + quantitative_vars)
-        )
-
-        for row in reader:
-            for column_name, column_number in column_numbers.items():
-                row_data = row[column_number]  # Obtém o dado da coluna correspondente
-
-                if column_name in ["primary_genres", "descriptors"]:
-                    row_data = row_data.split(
-                        ", "
-                    )  # Algumas entradas contêm múltiplos valores separados por vírgula
-                else:
-                    row_data = [row_data]
-
-                for data_entry in row_data:
-                    data[column_name].add(
-                        data_entry
-                    )  # Adiciona o dado ao conjunto correspondente (evitando duplicatas)
-                    data_occurences[data_entry] = (
-                        data_occurences.get(data_entry, 0) + 1
-                    )  # Atualiza o número de ocorrências do dado
-
-
-def add_relative_frequency(df: pd.DataFrame) -> pd.DataFrame:
+def calculate_relative_frequency(frequencies: list) -> list:
     """
-    Adiciona uma coluna de frequência relativa a uma tabela de frequência
+    Calcula a frequência relativa (em %, com duas casas decimais) de cada classe
 
-    @param df: DataFrame com a tabela de frequência
+    @param frequencies: Lista com as frequências absolutas
     """
 
-    total_frequency = df["Frequência"].sum()
-    df["Frequência Relativa (%)"] = (df["Frequência"] / total_frequency * 100).round(2)
-    return df
+    frequencies = np.asarray(frequencies, dtype=float)
+    return np.round(frequencies / frequencies.sum() * 100, 2).tolist()
 
 
-def generate_qualitative_tables() -> None:
+def generate_qualitative_tables(records: ReleaseRecords, config: dict) -> None:
     """
     Função que gera as tabelas de frequência para variáveis qualitativas
+
+    @param records: Registros dos lançamentos
+    @param config: Configuração do pipeline
     """
 
-    for variable in qualitative_vars:
+    size_limit = config["frequency_tables"]["size_limit"]
+    for variable in config["variables"]["qualitative"]:
         translated_variable = translation[variable]
         table = {translated_variable: [], "Frequência": []}
+        column = records[variable]
 
         # Ordena por frequência decrescente. Em caso de empate, ordena alfabeticamente
         sorted_entries = sorted(
-            [
-                (data_entry, data_occurences[data_entry])
-                for data_entry in data[variable]
-            ],
+            zip(column.vocabulary, column.counts().tolist()),
             key=lambda x: (-x[1], x[0]),
         )
 
         for i, (data_entry, frequency) in enumerate(sorted_entries):
-            if i < TABLE_SIZE_LIMIT:
+            if i < size_limit:
                 table[translated_variable].append(data_entry)
                 table["Frequência"].append(frequency)
             else:
                 break
 
-        if len(sorted_entries) > TABLE_SIZE_LIMIT:
-            others_sum = sum(freq for _, freq in sorted_entries[TABLE_SIZE_LIMIT:])
+        if len(sorted_entries) > size_limit:
+            others_sum = sum(freq for _, freq in sorted_entries[size_limit:])
             table[translated_variable].append("Others")
             table["Frequência"].append(others_sum)
 
-        df = pd.DataFrame(table)
-        df = add_relative_frequency(df)
-        df.to_csv(f"outputs/{translated_variable}_table.csv", index=False)
+        table["Frequência Relativa (%)"] = calculate_relative_frequency(table["Frequência"])
+        save_table(f"{translated_variable}_table", table, config["outputs"])
 
 
-def generate_quantitative_tables() -> None:
+def generate_quantitative_tables(records: ReleaseRecords, config: dict) -> None:
     """
     Função que gera as tabelas de frequência para variáveis quantitativas
 
     Esta função processa cada variável quantitativa, dividindo os dados em classes
-    de acordo com a regra de Sturges.
+    de acordo com a estratégia configurada em frequency_tables.binning.
+
+    @param records: Registros dos lançamentos
+    @param config: Configuração do pipeline
     """
 
-    for variable in quantitative_vars:
+    binning_strategies = config["frequency_tables"]["binning"]
+    for variable in config["variables"]["quantitative"]:
         # Coleta os valores e frequências para a variável atual
-        values = collect_variable_values(variable)
+        values = collect_variable_values(records, variable)
 
         if not values:
             continue
 
-        # Determina os limites e configurações para as classes
-        min_val, max_val = get_min_max_values(values)
-        total_frequency = sum(freq for _, freq in values)
-        nbins = sturges_rule(total_frequency)
+        strategy = binning_strategies.get(variable, "sturges")
 
-        # Cria as bordas dos intervalos para as classes
-        bin_edges = create_bin_edges(variable, min_val, max_val, nbins)
+        # Ordena a coluna uma única vez; bordas e frequências saem dela
+        sorted_vals, cum_weights = sort_weighted_values(values)
 
-        suffix = ''
-        if variable == "review_count":
-            # Gambiarra necessária
-            # Primeiro cria a tabela original, sem ajustes para o gráfico
-            
-            labels = create_class_labels(variable, bin_edges, nbins)
-            freq_bins = calculate_class_frequencies(variable, values, bin_edges, nbins)
-            create_and_save_table(variable, labels, freq_bins)
-
-            # Ajusta os intervalos para que o gráfico fique com boas proporções
-            # Uma nova tabela de frequência será gerada só para gráfico
-            bin_edges = bin_edges.tolist()
-            bin_edges.insert(1, 70)
-            last = bin_edges[-1]
-            bin_edges = bin_edges[:8]
-            bin_edges[-1] = last
+        if variable == "release_date":
+            # Para datas, a estratégia define apenas o número de classes; as bordas são dias inteiros
+            nbins = compute_bin_count(strategy, sorted_vals, cum_weights)
+            if BINNING_STRATEGIES[strategy][1] is not linear_edges:
+                raise ValueError(f"A estratégia {strategy} não é suportada para datas")
+            bin_edges = create_bin_edges(variable, int(sorted_vals[0]), int(sorted_vals[-1]), nbins)
+            nbins = len(bin_edges) - 1
+        else:
+            bin_edges = compute_bin_edges(strategy, sorted_vals, cum_weights)
             nbins = len(bin_edges) - 1
-            
-            suffix = '_ajustado'
+
+        freq_bins = count_in_bins(sorted_vals, cum_weights, bin_edges)
 
         # Cria rótulos descritivos para as classes
         labels = create_class_labels(variable, bin_edges, nbins)
 
-        # Calcula a frequência para cada classe
-        freq_bins = calculate_class_frequencies(variable, values, bin_edges, nbins)
-
         # Cria a tabela e salva como CSV
-        create_and_save_table(variable, labels, freq_bins, suffix)
+        create_and_save_table(variable, labels, freq_bins, config["outputs"])
+        save_class_edges(variable, bin_edges, config["outputs"])
 
 
-def collect_variable_values(variable: str) -> list[tuple]:
+def collect_variable_values(records: ReleaseRecords, variable: str) -> list[tuple]:
     """
-    Coleta todos os valores e suas frequências para uma variável.
+    Coleta todos os valores distintos e suas frequências para uma variável.
 
+    @param records: Registros dos lançamentos
     @param variable: Nome da variável a ser processada
     @return: Lista de tuplas (valor_numérico, frequência)
     """
 
-    values = []
-    for entry in data[variable]:
-        if variable == "release_date":
-            # Converte a string de data para um objeto datetime
-            date_obj = datetime.strptime(entry, "%Y-%m-%d")
-            num_value = date_obj
-        else:
-            # Para outras variáveis quantitativas, converte para float
-            num_value = float(entry)
-
-        freq = data_occurences.get(entry, 0)
-        values.append((num_value, freq))
-
-    return values
-
-
-def get_min_max_values(values: list[tuple]) -> tuple:
-    """
-    Determina os valores mínimo e máximo dentre os dados.
+    if variable == "release_date":
+        # Datas são representadas pelo número de dias desde 1970-01-01
+        column = date_offsets(records[variable])
+    else:
+        column = records[variable].astype(float)
 
-    @param values: Lista de tuplas (valor, frequência)
-    @return (valor_mínimo, valor_máximo)
-    """
+    unique_values, counts = np.unique(column, return_counts=True)
 
-    val_nums = [val for val, _ in values]
-    return min(val_nums), max(val_nums)
+    return list(zip(unique_values.tolist(), counts.tolist()))
 
 
 def create_bin_edges(variable: str, min_val, max_val, nbins: int) -> list:
@@ -232,11 +155,8 @@ def create_bin_edges(variable: str, min_val, max_val, nbins: int) -> list:
     """
 
     if variable == "release_date":
-        # Para datas, precisamos ajustar para garantir que a data máxima seja incluída
-        # Adicionamos um dia ao valor máximo para garantir que ele fique na última classe
-        adjusted_max = max_val + timedelta(days=1)
-        time_delta = adjusted_max - min_val
-        return [min_val + (time_delta / nbins) * i for i in range(nbins + 1)]
+        # Para datas (em dias), as bordas são inteiras e a última inclui a data máxima
+        return date_bin_edges(min_val, max_val, nbins)
     else:
         # Para valores numéricos, usamos o linspace do numpy
         return np.linspace(min_val, max_val, nbins + 1)
@@ -253,18 +173,16 @@ def create_class_labels(variable: str, bin_edges: list, nbins: int) -> list:
     @return: Lista de rótulos para as classes
     """
 
+    if variable == "release_date":
+        # Para datas, o limite superior é um dia antes da borda seguinte (rótulos vetorizados)
+        return date_class_labels(bin_edges)
+
     labels = []
     for i in range(nbins):
         low = bin_edges[i]
         high = bin_edges[i + 1]
 
-        if variable == "release_date":
-            # Para datas, subtraímos um dia do limite superior para evitar sobreposição
-            upper_date = high - timedelta(days=1)
-            labels.append(
-                f"{low.strftime('%Y-%m-%d')} - {upper_date.strftime('%Y-%m-%d')}"
-            )
-        elif variable == "review_count":
+        if variable == "review_count":
             # Para contagens, usamos valores inteiros
             if i < nbins - 1:
                 labels.append(f"{int(low)} - {int(high) - 1}")
@@ -280,80 +198,86 @@ def create_class_labels(variable: str, bin_edges: list, nbins: int) -> list:
     return labels
 
 
-def calculate_class_frequencies(variable: str, values: list[tuple], bin_edges: list, nbins: int) -> list:
+def create_and_save_table(variable: str, labels: list, freq_bins: list, output_options: dict) -> None:
     """
-    Calcula a frequência para cada classe.
+    Cria a tabela de frequência e salva como CSV.
 
     @param variable: Nome da variável
-    @param values: Lista de tuplas (valor, frequência)
-    @param bin_edges: Lista com as bordas dos intervalos
-    @param nbins: Número de classes
-
-    @return Lista com as frequências de cada classe
+    @param labels: Lista de rótulos para as classes
+    @param freq_bins: Lista com as frequências de cada classe
+    @param output_options: Seção [outputs] da configuração
     """
 
-    freq_bins = [0] * nbins
+    variable = translation[variable]
+    table = {
+        variable: labels,
+        "Frequência": freq_bins,
+        "Frequência Relativa (%)": calculate_relative_frequency(freq_bins),
+    }
+    save_table(f"{variable}_table", table, output_options)
 
-    for val, freq in values:
-        if variable == "release_date":
-            # Para datas, verificamos explicitamente cada intervalo
-            bin_index = 0
-            for j in range(nbins):
-                if j == nbins - 1:
-                    # Último bin inclui o limite superior
-                    if bin_edges[j] <= val <= bin_edges[j + 1]:
-                        bin_index = j
-                        break
-                else:
-                    # Demais bins excluem o limite superior
-                    if bin_edges[j] <= val < bin_edges[j + 1]:
-                        bin_index = j
-                        break
-        else:
-            # Para valores numéricos, calculamos o índice baseado na posição relativa
-            if val == max(val for val, _ in values):
-                # Se for o valor máximo, garantimos que fique na última classe
-                bin_index = nbins - 1
-            else:
-                # O índice da frequência a ser incrementada é o índice que representa
-                # o intervalo ao qual o valor pertence
-                for i, (low, high) in enumerate(zip(bin_edges, bin_edges[1:])):
-                    if low <= val <= high:
-                        bin_index = i
-                        break
 
-                # Proteção contra valores fora dos limites
-                bin_index = min(bin_index, nbins - 1)
+def save_class_edges(variable: str, bin_edges, output_options: dict) -> None:
+    """
+    Salva as bordas exatas das classes em <variável>_bordas.json, para que os gráficos
+    não precisem reconstruí-las a partir dos rótulos arredondados da tabela
 
-        freq_bins[bin_index] += freq
+    @param variable: Nome da variável
+    @param bin_edges: Bordas das classes (para datas, em dias desde 1970-01-01)
+    @param output_options: Seção [outputs] da configuração
+    """
 
-    return freq_bins
+    edges = np.asarray(bin_edges, dtype=float).tolist()
+    write_json(output_path(output_options, f"{translation[variable]}_bordas.json"), {"Bordas": edges})
 
 
-def create_and_save_table(variable: str, labels: list, freq_bins: list, file_suffix: str = '') -> None:
+def generate_kde_tables(records: ReleaseRecords, config: dict) -> None:
     """
-    Cria a tabela de frequência e salva como CSV.
+    Função que estima a densidade (KDE) das variáveis em frequency_tables.kde e salva a grade como CSV
 
-    @param variable: Nome da variável
-    @param labels: Lista de rótulos para as classes
-    @param freq_bins: Lista com as frequências de cada classe
+    Datas são tratadas como número de dias; a densidade resultante é por dia.
+
+    @param records: Registros dos lançamentos
+    @param config: Configuração do pipeline
     """
 
-    variable = translation[variable]
-    table = {variable: labels, "Frequência": freq_bins}
-    df = pd.DataFrame(table)
-    df = add_relative_frequency(df)
-    df.to_csv(f"outputs/{variable}{file_suffix}_table.csv", index=False)
+    grid_size = config["frequency_tables"]["kde_grid_size"]
+    for variable in config["frequency_tables"]["kde"]:
+        values = collect_variable_values(records, variable)
+
+        if not values:
+            continue
+
+        val_nums = [val for val, _ in values]
+        freqs = [freq for _, freq in values]
+
+        grid, density = fft_kde(val_nums, freqs, gridsize=grid_size)
 
+        if variable == "release_date":
+            grid = offsets_to_strings(np.round(grid)).tolist()
+        else:
+            grid = grid.tolist()
 
-def generate_frequency_tables() -> None:
+        translated_variable = translation[variable]
+        table = {translated_variable: grid, "Densidade": density.tolist()}
+        save_table(f"{translated_variable}_kde", table, config["outputs"])
+
+
+def generate_frequency_tables(records: ReleaseRecords | None = None, config: dict | None = None) -> None:
     """
     Função que gera as tabelas de frequência para as variáveis de interesse
+
+    @param records: Registros dos lançamentos; se None, são lidos do CSV
+    @param config: Configuração do pipeline; se None, é lida de config.CONFIG_PATH
     """
 
-    get_csv_data()
-    generate_qualitative_tables()
-    generate_quantitative_tables()
+    if config is None:
+        config = load_config()
+    if records is None:
+        records = load_planned_records(config, ["frequency_tables"])
+    generate_qualitative_tables(records, config)
+    generate_quantitative_tables(records, config)
+    generate_kde_tables(records, config)
 
 
 if __name__ == "__main__":
@@ -1,18 +1,75 @@
+import copy
+import os
+import time
+
+from config import load_config, load_planned_records
 from frequency_tables import generate_frequency_tables
 from variables_graphs import plot_all_graphs
 from variable_relationships import plot_variable_relationships
 from summary_statistics import get_summary_statistics
+from robust_statistics import get_robust_statistics
+from hypothesis_tests import get_hypothesis_tests
+from contingency_analysis import get_contingency_analysis
+
+def run(dataset_path: str, output_dir: str, config: dict | None = None, verbose: bool = False) -> dict[str, float]:
+    """
+    Gera todas as saídas de um conjunto de dados
+
+    Todo o estado vem dos argumentos (nada é guardado em variáveis de módulo), então
+    várias execuções podem ocorrer no mesmo processo, uma após a outra.
+
+    @param dataset_path: Caminho do CSV
+    @param output_dir: Diretório onde as saídas são salvas (criado se não existir)
+    @param config: Configuração do pipeline; se None, é lida de config.CONFIG_PATH.
+        input.path e outputs.directory são substituídos pelos argumentos acima
+    @param verbose: Se True, imprime o andamento das etapas
+
+    @return: Tempo (em segundos) de cada etapa executada
+    """
+    config = copy.deepcopy(load_config() if config is None else config)
+    config['input']['path'] = dataset_path
+    config['outputs']['directory'] = output_dir
+    os.makedirs(output_dir, exist_ok=True)
+
+    timings = {}
+
+    def run_stage(name: str, message: str, stage, *args):
+        if verbose:
+            print(message)
+        start = time.perf_counter()
+        result = stage(*args)
+        timings[name] = time.perf_counter() - start
+        return result
+
+    # Apenas as colunas usadas pelas etapas ativas são carregadas
+    records = run_stage('load', 'Lendo o conjunto de dados...', load_planned_records, config)
+    if config['frequency_tables']['enabled']:
+        run_stage('frequency_tables', 'Construindo tabelas de frequências...',
+                  generate_frequency_tables, records, config)
+    # As medidas de resumo vêm antes dos gráficos, pois os boxplots dependem delas
+    if config['summary_statistics']['enabled']:
+        run_stage('summary_statistics', 'Gerando as medidas de resumo das variáveis...',
+                  get_summary_statistics, records, config)
+    if config['robust_statistics']['enabled']:
+        run_stage('robust_statistics', 'Calculando as medidas robustas e os outliers...',
+                  get_robust_statistics, records, config)
+    if config['hypothesis_tests']['enabled']:
+        run_stage('hypothesis_tests', 'Executando os testes de hipótese entre gêneros e descritores...',
+                  get_hypothesis_tests, records, config)
+    if config['contingency']['enabled']:
+        run_stage('contingency', 'Executando a análise de contingência por década...',
+                  get_contingency_analysis, records, config)
+    if config['graphs']['enabled']:
+        run_stage('graphs', 'Plotando gráficos...', plot_all_graphs, config, verbose)
+    if config['relationships']['enabled']:
+        run_stage('relationships', 'Gerando gráficos de relação entre variáveis...',
+                  plot_variable_relationships, records, config)
+    return timings
 
 def generate_outputs() -> None:
-    print('Construindo tabelas de frequências...')
-    generate_frequency_tables()
-    print('Plotando gráficos...')
-    plot_all_graphs()
-    print('Gerando gráficos de relação entre variáveis...')
-    plot_variable_relationships()
-    print("Gerando as medidas de resumo das variáveis...")
-    get_summary_statistics()
+    config = load_config()
+    run(config['input']['path'], config['outputs']['directory'], config, verbose=True)
     print('Outputs gerados com sucesso!')
 
 if __name__ == '__main__':
-    generate_outputs()
\ No newline at end of file
+    generate_outputs()
@@ -0,0 +1,272 @@
+"""
+Módulo com testes de hipótese comparando a média das avaliações entre gêneros/descritores
+
+Cada ocorrência de um gênero (ou descritor) frequente contribui com a avaliação do seu
+lançamento. Uma única ordenação global das avaliações (np.unique) leva cada ocorrência ao
+seu valor distinto, e um único bincount monta a matriz de contagens grupo x valor distinto.
+Todas as estatísticas saem dessa matriz por produtos matriciais: somas e somas de
+quadrados (Welch e ANOVA), postos médios (Kruskal-Wallis) e, para cada par de grupos, o
+U de Mann-Whitney com correção de empates, sem recalcular postos par a par.
+
+Como um lançamento pode ter vários gêneros, as amostras dos grupos não são independentes;
+os p-valores devem ser lidos como uma medida descritiva da separação entre os grupos.
+"""
+
+import numpy as np
+from scipy import special
+
+from config import load_config, load_planned_records
+from frequency_tables import translation
+from multiple_comparisons import adjust_p_values
+from output_formats import save_table
+from records import ReleaseRecords
+
+
+def group_value_counts(group_ids: np.ndarray, values: np.ndarray, n_groups: int):
+    """
+    Conta as ocorrências de cada valor distinto em cada grupo
+
+    @param group_ids: Grupo (0..n_groups-1) de cada ocorrência
+    @param values: Valor de cada ocorrência
+    @param n_groups: Número de grupos
+
+    @return: Tupla (valores distintos ordenados, matriz de contagens n_groups x valores)
+    """
+
+    distinct, value_index = np.unique(values, return_inverse=True)
+    counts = np.bincount(
+        group_ids * len(distinct) + value_index.ravel(), minlength=n_groups * len(distinct)
+    ).reshape(n_groups, len(distinct))
+    return distinct, counts.astype(float)
+
+
+def group_moments(distinct: np.ndarray, counts: np.ndarray):
+    """
+    Tamanho, média e variância amostral (ddof=1) de cada grupo
+
+    Os valores são centralizados na média geral antes das somas de quadrados, para
+    evitar o cancelamento numérico de sum(x²) - n * média². Grupos de valor constante
+    ainda podem resultar em uma variância levemente negativa, que é truncada em zero.
+    """
+
+    sizes = counts.sum(axis=1)
+    grand_mean = counts.sum(axis=0) @ distinct / sizes.sum()
+    centered = distinct - grand_mean
+
+    sums = counts @ centered
+    squares = counts @ centered ** 2
+    means = sums / sizes
+    variances = np.maximum((squares - sums * means) / (sizes - 1), 0)
+    return sizes, means + grand_mean, variances
+
+
+def midranks(value_counts: np.ndarray) -> np.ndarray:
+    """
+    Posto médio de cada valor distinto (empates recebem a média das posições que ocupam)
+
+    @param value_counts: Número de ocorrências de cada valor distinto, em ordem crescente
+    """
+
+    before = np.cumsum(value_counts) - value_counts
+    return before + (value_counts + 1) / 2
+
+
+def one_way_anova(sizes: np.ndarray, means: np.ndarray, variances: np.ndarray) -> dict:
+    """
+    ANOVA de um fator: F = (SQ entre grupos / (k - 1)) / (SQ dentro dos grupos / (N - k))
+    """
+
+    k = len(sizes)
+    total = sizes.sum()
+    grand_mean = sizes @ means / total
+    between = sizes @ (means - grand_mean) ** 2
+    within = (sizes - 1) @ variances
+    df_between, df_within = k - 1, total - k
+    statistic = (between / df_between) / (within / df_within)
+    return {
+        "statistic": float(statistic),
+        "df": f"{df_between}, {int(df_within)}",
+        "p_value": float(special.fdtrc(df_between, df_within, statistic)),
+    }
+
+
+def kruskal_wallis(counts: np.ndarray) -> dict:
+    """
+    Teste de Kruskal-Wallis a partir dos postos médios globais, com correção de empates
+    """
+
+    k = counts.shape[0]
+    sizes = counts.sum(axis=1)
+    value_counts = counts.sum(axis=0)
+    total = sizes.sum()
+
+    rank_sums = counts @ midranks(value_counts)
+    statistic = 12 / (total * (total + 1)) * np.sum(rank_sums ** 2 / sizes) - 3 * (total + 1)
+    ties = 1 - np.sum(value_counts ** 3 - value_counts) / (total ** 3 - total)
+    statistic = statistic / ties if ties > 0 else 0.0
+    return {
+        "statistic": float(statistic),
+        "df": f"{k - 1}",
+        "p_value": float(special.chdtrc(k - 1, statistic)),
+    }
+
+
+def pairwise_welch(sizes: np.ndarray, means: np.ndarray, variances: np.ndarray, first, second) -> dict:
+    """
+    Teste t de Welch (bilateral) para os pares de grupos (first[i], second[i])
+    """
+
+    error_a = variances[first] / sizes[first]
+    error_b = variances[second] / sizes[second]
+    standard_error = np.sqrt(error_a + error_b)
+    difference = means[first] - means[second]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        statistic = difference / standard_error
+        # Graus de liberdade de Welch-Satterthwaite
+        df = (error_a + error_b) ** 2 / (
+            error_a ** 2 / (sizes[first] - 1) + error_b ** 2 / (sizes[second] - 1)
+        )
+    p_value = 2 * special.stdtr(df, -np.abs(statistic))
+    # Dois grupos constantes e diferentes: t é infinito e os graus de liberdade ficam 0/0,
+    # mas o p-valor é 0 para qualquer número de graus de liberdade
+    p_value[np.isinf(statistic)] = 0.0
+    return {"statistic": statistic, "df": df, "p_value": p_value}
+
+
+def pairwise_mann_whitney(counts: np.ndarray, first, second) -> dict:
+    """
+    Teste U de Mann-Whitney (bilateral, aproximação normal com correção de continuidade
+    e de empates) para os pares de grupos (first[i], second[i])
+
+    U de A contra B = soma, sobre os valores v de A, de #(B < v) + 0.5 * #(B = v). Com as
+    contagens acumuladas de cada grupo, isso vira um único produto matricial para todos
+    os pares; os termos de empate (t³ - t) sobre a união de A e B também.
+    """
+
+    below = np.cumsum(counts, axis=1) - counts
+    u_matrix = counts @ (below + 0.5 * counts).T
+
+    # Σ_v (a_v + b_v)³ - (a_v + b_v), expandido em produtos entre os grupos
+    cubes = (counts ** 3).sum(axis=1)
+    squares = counts ** 2
+    cross = 3 * (squares @ counts.T)
+    sizes = counts.sum(axis=1)
+    ties = (
+        cubes[first] + cubes[second] + cross[first, second] + cross[second, first]
+        - sizes[first] - sizes[second]
+    )
+
+    n_a, n_b = sizes[first], sizes[second]
+    n = n_a + n_b
+    statistic = u_matrix[first, second]
+    mean = n_a * n_b / 2
+    std = np.sqrt(n_a * n_b / 12 * ((n + 1) - ties / (n * (n - 1))))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.maximum(np.abs(statistic - mean) - 0.5, 0) / std
+    p_value = np.minimum(2 * special.ndtr(-z), 1.0)
+    return {"statistic": statistic, "z": z, "p_value": p_value}
+
+
+def compare_token_groups(records: ReleaseRecords, column: str, options: dict):
+    """
+    Executa os testes globais e os testes por pares para os valores frequentes de uma coluna
+
+    @param records: Registros dos lançamentos
+    @param column: Variável qualitativa (primary_genres ou descriptors)
+    @param options: Seção [hypothesis_tests] da configuração
+
+    @return: Tupla (tabela dos testes globais, tabela dos pares), ou None se houver menos
+        de dois grupos frequentes
+    """
+
+    tokens = records[column]
+    token_counts = tokens.counts()
+    frequent = np.flatnonzero(token_counts >= options["min_count"])
+    # Grupos na ordem de frequência decrescente
+    frequent = frequent[np.argsort(-token_counts[frequent], kind="stable")]
+    if options["max_groups"] > 0:
+        frequent = frequent[:options["max_groups"]]
+    if len(frequent) < 2:
+        return None
+
+    # Posição de cada valor da coluna entre os grupos (-1 para os que ficam de fora)
+    group_of = np.full(len(tokens.vocabulary), -1)
+    group_of[frequent] = np.arange(len(frequent))
+    occurrence_groups = group_of[tokens.ids]
+    selected = occurrence_groups >= 0
+    ratings = records["avg_rating"][tokens.row_index()[selected]]
+
+    distinct, counts = group_value_counts(occurrence_groups[selected], ratings, len(frequent))
+    sizes, means, variances = group_moments(distinct, counts)
+
+    anova = one_way_anova(sizes, means, variances)
+    kruskal = kruskal_wallis(counts)
+    omnibus_table = {
+        "Teste": ["ANOVA (um fator)", "Kruskal-Wallis"],
+        "Estatística": [anova["statistic"], kruskal["statistic"]],
+        "Graus de liberdade": [anova["df"], kruskal["df"]],
+        "p-valor": [anova["p_value"], kruskal["p_value"]],
+        "Grupos": [len(frequent)] * 2,
+        "Ocorrências": [int(sizes.sum())] * 2,
+    }
+
+    first, second = np.triu_indices(len(frequent), k=1)
+    welch = pairwise_welch(sizes, means, variances, first, second)
+    mann_whitney = pairwise_mann_whitney(counts, first, second)
+    welch_adjusted = adjust_p_values(welch["p_value"], options["correction"])
+    mann_whitney_adjusted = adjust_p_values(mann_whitney["p_value"], options["correction"])
+
+    names = np.array([tokens.vocabulary[token_id] for token_id in frequent], dtype=object)
+    alpha = options["alpha"]
+    pairs_table = {
+        "Grupo A": names[first].tolist(),
+        "Grupo B": names[second].tolist(),
+        "n A": sizes[first].astype(int).tolist(),
+        "n B": sizes[second].astype(int).tolist(),
+        "Média A": np.round(means[first], 4).tolist(),
+        "Média B": np.round(means[second], 4).tolist(),
+        "Diferença": np.round(means[first] - means[second], 4).tolist(),
+        "t de Welch": np.round(welch["statistic"], 4).tolist(),
+        "Graus de liberdade": np.round(welch["df"], 2).tolist(),
+        "p-valor (Welch)": welch["p_value"].tolist(),
+        f"p-valor ajustado (Welch, {options['correction']})": welch_adjusted.tolist(),
+        "U de Mann-Whitney": mann_whitney["statistic"].tolist(),
+        "z": np.round(mann_whitney["z"], 4).tolist(),
+        "p-valor (Mann-Whitney)": mann_whitney["p_value"].tolist(),
+        f"p-valor ajustado (Mann-Whitney, {options['correction']})": mann_whitney_adjusted.tolist(),
+        f"Significativo (α = {alpha})": (
+            (welch_adjusted < alpha) & (mann_whitney_adjusted < alpha)
+        ).tolist(),
+    }
+    return omnibus_table, pairs_table
+
+
+def get_hypothesis_tests(records: ReleaseRecords | None = None, config: dict | None = None) -> None:
+    """
+    Compara a média das avaliações entre os valores frequentes das colunas em
+    hypothesis_tests.columns e salva as tabelas <variável>_testes e <variável>_testes_pares
+    no diretório de saída
+
+    @param records: Registros dos lançamentos; se None, são lidos do CSV
+    @param config: Configuração do pipeline; se None, é lida de config.CONFIG_PATH
+    """
+
+    if config is None:
+        config = load_config()
+    if records is None:
+        records = load_planned_records(config, ["hypothesis_tests"])
+    options = config["hypothesis_tests"]
+
+    for column in options["columns"]:
+        tables = compare_token_groups(records, column, options)
+        if tables is None:
+            continue
+        omnibus_table, pairs_table = tables
+        save_table(f"{translation[column]}_testes", omnibus_table, config["outputs"])
+        save_table(f"{translation[column]}_testes_pares", pairs_table, config["outputs"])
+
+
+if __name__ == "__main__":
+    get_hypothesis_tests()
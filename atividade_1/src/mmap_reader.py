@@ -0,0 +1,362 @@
+"""
+Módulo para a leitura do CSV dos lançamentos via mapeamento em memória (mmap)
+
+O arquivo é tratado como bytes, sem decodificar o texto: os delimitadores (vírgulas e
+quebras de linha fora de aspas) são localizados com o NumPy e cada campo vira um par
+(início, fim) de posições. Só as colunas projetadas são materializadas; os números e as
+datas são convertidos em bloco, e os textos das variáveis qualitativas são decodificados
+uma única vez por entrada do vocabulário, nunca por ocorrência.
+"""
+
+import csv
+import mmap
+import traceback
+
+import numpy as np
+
+from dates import PARTIAL_DATE_POLICY, parse_dates
+from records import (
+    MISSING_VALUE,
+    MULTI_VALUE_COLUMNS,
+    TOKEN_COLUMNS,
+    TRUNCATION_MARKER,
+    ReleaseRecords,
+    TokenColumn,
+    project_columns,
+    projected_column_numbers,
+    projected_dtype,
+)
+
+SCAN_BLOCK_SIZE = 4 * 1024 * 1024  # Tamanho dos blocos na busca pelos delimitadores
+QUOTE = ord('"')
+COMMA = ord(",")
+NEWLINE = ord("\n")
+CARRIAGE_RETURN = ord("\r")
+SPACE = ord(" ")
+
+
+def find_delimiters(buffer: np.ndarray, block_size: int = SCAN_BLOCK_SIZE):
+    """
+    Localiza os delimitadores do CSV, processando o buffer bloco a bloco
+
+    @param buffer: Conteúdo do arquivo (uint8)
+    @param block_size: Tamanho de cada bloco
+
+    @return: Tupla (delimitadores fora de aspas, vírgulas dentro de aspas), em posições de bytes
+    """
+
+    delimiters = []
+    quoted_commas = []
+    parity = 0
+
+    for start in range(0, len(buffer), block_size):
+        block = buffer[start:start + block_size]
+        # Paridade acumulada das aspas: 1 dentro de um campo entre aspas
+        quotes = np.bitwise_xor.accumulate((block == QUOTE).view(np.uint8))
+        inside_quotes = (quotes ^ parity) == 1
+        is_comma = block == COMMA
+
+        delimiters.append(
+            np.flatnonzero((is_comma | (block == NEWLINE)) & ~inside_quotes) + start
+        )
+        quoted_commas.append(np.flatnonzero(is_comma & inside_quotes) + start)
+        parity ^= int(quotes[-1])
+
+    empty = [np.empty(0, dtype=np.int64)]
+    return np.concatenate(delimiters or empty), np.concatenate(quoted_commas or empty)
+
+
+def field_bounds(buffer: np.ndarray, n_columns: int):
+    """
+    Calcula o início e o fim (exclusivo) de cada campo, sem as aspas externas
+
+    @param buffer: Registros do CSV, sem o cabeçalho (uint8)
+    @param n_columns: Número de colunas de cada registro
+
+    @return: Tupla (inícios, fins, vírgulas dentro de aspas); inícios e fins têm
+        formato (registros, colunas)
+    """
+
+    delimiters, quoted_commas = find_delimiters(buffer)
+
+    # O último registro pode não terminar com quebra de linha
+    if len(buffer) and buffer[-1] != NEWLINE:
+        delimiters = np.append(delimiters, len(buffer))
+
+    if len(delimiters) % n_columns:
+        raise ValueError("O CSV tem registros com número de colunas diferente do cabeçalho")
+
+    ends = delimiters.reshape(-1, n_columns)
+
+    # Cada registro deve terminar em uma quebra de linha (ou no fim do arquivo)
+    last = ends[:, -1]
+    in_buffer = last < len(buffer)
+    if np.any(buffer[last[in_buffer]] != NEWLINE):
+        raise ValueError("O CSV tem registros com número de colunas diferente do cabeçalho")
+
+    starts = np.empty_like(ends)
+    starts.flat[0] = 0
+    starts.flat[1:] = delimiters[:-1] + 1
+
+    # Remove o "\r" de quebras de linha no formato Windows
+    last = ends[:, -1]
+    has_cr = (last > starts[:, -1]) & (buffer[np.maximum(last - 1, 0)] == CARRIAGE_RETURN)
+    ends[has_cr, -1] -= 1
+
+    # Remove as aspas externas
+    quoted = (ends - starts >= 2) & (buffer[np.minimum(starts, len(buffer) - 1)] == QUOTE)
+    starts[quoted] += 1
+    ends[quoted] -= 1
+
+    return starts, ends, quoted_commas
+
+
+def gather_fixed_width(buffer: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Copia os campos para um array de bytes de largura fixa ("S<largura>")
+
+    Apenas os bytes dos campos são copiados (custo proporcional ao total de bytes); o
+    restante fica zerado, o que o NumPy trata como fim do texto.
+    """
+
+    lengths = ends - starts
+    width = max(int(lengths.max(initial=0)), 1)
+    gathered = np.zeros((len(starts), width), dtype=np.uint8)
+
+    # Posição de cada byte dentro do seu campo
+    field_of_byte = np.repeat(np.arange(len(starts)), lengths)
+    position_in_field = np.arange(int(lengths.sum())) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    gathered[field_of_byte, position_in_field] = buffer[starts[field_of_byte] + position_in_field]
+
+    return gathered.view(f"S{width}").ravel()
+
+
+def hash_fields(fields: np.ndarray) -> np.ndarray:
+    """
+    Calcula um hash de 64 bits de cada campo, lendo os bytes em blocos de 8
+    """
+
+    width = fields.dtype.itemsize
+    padded_width = -(-width // 8) * 8
+    padded = np.zeros((len(fields), padded_width), dtype=np.uint8)
+    padded[:, :width] = fields.view(np.uint8).reshape(len(fields), width)
+    words = padded.view(np.uint64)
+
+    hashes = np.full(len(fields), 0xCBF29CE484222325, dtype=np.uint64)
+    for i in range(words.shape[1]):
+        hashes = (hashes ^ words[:, i]) * np.uint64(0x100000001B3)
+        hashes ^= hashes >> np.uint64(29)
+    return hashes
+
+
+def encode_tokens(fields: np.ndarray) -> tuple[list[str], np.ndarray]:
+    """
+    Codifica os campos por dicionário, com ids na ordem de primeira aparição
+
+    Os campos são agrupados pelo hash (ordenar inteiros é bem mais rápido que ordenar
+    textos); se houver colisão, o agrupamento é refeito pelos próprios bytes.
+
+    @param fields: Array "S<largura>" com um campo por ocorrência
+
+    @return: Tupla (vocabulário decodificado, ids)
+    """
+
+    _, first_index, inverse = np.unique(hash_fields(fields), return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    if np.any(fields[first_index[inverse]] != fields):
+        _, first_index, inverse = np.unique(fields, return_index=True, return_inverse=True)
+        inverse = inverse.ravel()
+
+    order = np.argsort(first_index, kind="stable")
+    rank = np.empty(len(order), dtype=np.int32)
+    rank[order] = np.arange(len(order), dtype=np.int32)
+
+    # Apenas as entradas do vocabulário são decodificadas
+    vocabulary = [value.replace(b'""', b'"').decode("utf-8") for value in fields[first_index[order]]]
+    return vocabulary, rank[inverse]
+
+
+def split_multi_value(
+    buffer: np.ndarray, starts: np.ndarray, ends: np.ndarray, quoted_commas: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Separa os campos com múltiplos valores ("a, b, c") em ocorrências individuais
+
+    @param starts: Início de cada campo
+    @param ends: Fim de cada campo
+    @param quoted_commas: Posição de todas as vírgulas dentro de aspas do arquivo
+
+    @return: Tupla (inícios das ocorrências, fins das ocorrências, offsets por campo)
+    """
+
+    # Vírgulas que pertencem a estes campos e são seguidas de espaço
+    field = np.searchsorted(starts, quoted_commas, side="right") - 1
+    inside = (field >= 0) & (quoted_commas < ends[np.maximum(field, 0)])
+    separators = quoted_commas[inside]
+    field = field[inside]
+    followed_by_space = buffer[np.minimum(separators + 1, len(buffer) - 1)] == SPACE
+    separators = separators[followed_by_space]
+    field = field[followed_by_space]
+
+    # Ocorrências: do início do campo até a 1ª vírgula, de cada vírgula + 2 até a seguinte...
+    token_starts = np.sort(np.concatenate((starts, separators + 2)))
+    token_ends = np.sort(np.concatenate((separators, ends)))
+    counts = np.bincount(field, minlength=len(starts)) + 1
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    return token_starts, token_ends, offsets
+
+
+def strip_truncation_marker(buffer: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Remove o marcador de truncamento (",...") do fim das ocorrências que o têm
+    """
+
+    marker = np.frombuffer(TRUNCATION_MARKER.encode(), dtype=np.uint8)
+    size = len(marker)
+    long_enough = ends - starts >= size
+    tail = buffer[np.maximum(ends - size, 0)[:, None] + np.arange(size)]
+    has_marker = long_enough & np.all(tail == marker, axis=1)
+    return np.where(has_marker, ends - size, ends)
+
+
+def build_token_column(
+    buffer: np.ndarray, column: str, starts: np.ndarray, ends: np.ndarray, quoted_commas: np.ndarray
+) -> TokenColumn:
+    """
+    Constrói a TokenColumn de uma variável qualitativa a partir das posições dos campos
+    """
+
+    # Campos ausentes ("NA") não geram ocorrências
+    missing_value = np.frombuffer(MISSING_VALUE.encode(), dtype=np.uint8)
+    is_missing = ends - starts == len(missing_value)
+    for i, byte in enumerate(missing_value):
+        is_missing &= buffer[np.minimum(starts + i, len(buffer) - 1)] == byte
+    starts, ends = starts[~is_missing], ends[~is_missing]
+    rows = np.flatnonzero(~is_missing)
+
+    if column in MULTI_VALUE_COLUMNS:
+        token_starts, token_ends, field_offsets = split_multi_value(buffer, starts, ends, quoted_commas)
+        token_ends = strip_truncation_marker(buffer, token_starts, token_ends)
+    else:
+        token_starts, token_ends = starts, ends
+        field_offsets = np.arange(len(starts) + 1)
+
+    # Reinsere as linhas ausentes (sem ocorrências) nos offsets
+    counts = np.zeros(len(is_missing), dtype=np.int64)
+    counts[rows] = np.diff(field_offsets)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    if len(token_starts):
+        vocabulary, ids = encode_tokens(gather_fixed_width(buffer, token_starts, token_ends))
+    else:
+        vocabulary, ids = [], np.empty(0, dtype=np.int32)
+    return TokenColumn(vocabulary=vocabulary, ids=ids, offsets=offsets)
+
+
+def parse_buffer(
+    buffer: np.ndarray,
+    column_numbers: dict[str, int],
+    n_columns: int,
+    date_policy: str = PARTIAL_DATE_POLICY,
+) -> tuple[np.ndarray, dict[str, TokenColumn]]:
+    """
+    Converte os registros de um buffer (sem cabeçalho) nas colunas projetadas
+
+    @param buffer: Registros do CSV (uint8)
+    @param column_numbers: Mapeia coluna -> número da coluna no CSV (ver
+        records.projected_column_numbers); só essas colunas são convertidas
+    @param n_columns: Número de colunas do CSV
+    @param date_policy: Tratamento das datas parciais (ver dates.PARTIAL_DATE_POLICIES)
+
+    @return: Tupla (array estruturado com os campos numéricos, colunas qualitativas)
+    """
+
+    if len(buffer) == 0:
+        starts = ends = np.empty((0, n_columns), dtype=np.int64)
+        quoted_commas = np.empty(0, dtype=np.int64)
+    else:
+        starts, ends, quoted_commas = field_bounds(buffer, n_columns)
+
+    dtype = projected_dtype(column_numbers)
+    rows = np.empty(len(starts), dtype=dtype)
+    for column in dtype.names:
+        number = column_numbers[column]
+        fields = gather_fixed_width(buffer, starts[:, number], ends[:, number])
+        if column == "release_date":
+            rows[column] = parse_dates(fields.astype(str), date_policy)
+        else:
+            rows[column] = fields.astype(dtype[column])
+
+    token_columns = {
+        column: build_token_column(
+            buffer, column, starts[:, column_numbers[column]], ends[:, column_numbers[column]],
+            quoted_commas,
+        )
+        for column in TOKEN_COLUMNS
+        if column in column_numbers
+    }
+    return rows, token_columns
+
+
+def read_header(buffer: np.ndarray) -> tuple[list[str], int]:
+    """
+    Lê o cabeçalho do CSV
+
+    @return: Tupla (nomes das colunas, posição do primeiro byte após o cabeçalho)
+    """
+
+    newlines = np.flatnonzero(buffer[:SCAN_BLOCK_SIZE] == NEWLINE)
+    header_end = int(newlines[0]) + 1 if len(newlines) else len(buffer)
+    header = next(csv.reader([buffer[:header_end].tobytes().decode("utf-8")]))
+    return header, header_end
+
+
+def parse_mapped_file(path: str, parse):
+    """
+    Mapeia o arquivo em memória, aplica parse ao buffer de bytes e fecha o mapeamento
+
+    Se parse falhar, os quadros do traceback ainda guardam views do buffer, e fechar o
+    mmap geraria BufferError no lugar do erro original. Por isso, as variáveis locais
+    desses quadros são liberadas antes de fechar, e só então o erro é relançado.
+
+    @param path: Caminho do arquivo
+    @param parse: Função que recebe o buffer (np.uint8) e devolve resultados que não
+        referenciam o buffer (cópias)
+    """
+
+    with open(path, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = np.frombuffer(mapped, dtype=np.uint8)
+        try:
+            return parse(buffer)
+        except BaseException as error:
+            traceback.clear_frames(error.__traceback__)
+            raise
+        finally:
+            del buffer
+            mapped.close()
+
+
+def load_records_mmap(
+    path: str,
+    date_policy: str = PARTIAL_DATE_POLICY,
+    columns: list[str] | None = None,
+) -> ReleaseRecords:
+    """
+    Lê o arquivo CSV via mmap e constrói os registros tipados dos lançamentos
+
+    @param path: Caminho do arquivo CSV
+    @param date_policy: Tratamento das datas parciais (ver dates.PARTIAL_DATE_POLICIES)
+    @param columns: Colunas a carregar; se None, todas
+    """
+
+    columns = project_columns(columns)
+
+    def parse(buffer: np.ndarray):
+        header, header_end = read_header(buffer)
+        return parse_buffer(
+            buffer[header_end:], projected_column_numbers(header, columns), len(header), date_policy
+        )
+
+    rows, token_columns = parse_mapped_file(path, parse)
+    return ReleaseRecords(rows, token_columns)
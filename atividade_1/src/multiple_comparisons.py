@@ -0,0 +1,51 @@
+"""
+Módulo com as correções de p-valores para comparações múltiplas
+"""
+
+import numpy as np
+
+CORRECTIONS = ("bonferroni", "holm", "fdr_bh")
+
+
+def adjust_p_values(p_values: np.ndarray, method: str) -> np.ndarray:
+    """
+    Corrige os p-valores para comparações múltiplas
+
+    P-valores NaN (testes indefinidos, ex.: grupos constantes e iguais) continuam NaN e
+    não entram na contagem m de testes.
+
+    @param p_values: P-valores dos testes
+    @param method: "bonferroni", "holm" (Holm-Bonferroni) ou "fdr_bh" (Benjamini-Hochberg)
+    """
+
+    if method not in CORRECTIONS:
+        raise ValueError(f"Correção desconhecida: {method}. Opções: {', '.join(CORRECTIONS)}")
+
+    p_values = np.asarray(p_values, dtype=float)
+    finite = np.isfinite(p_values)
+    result = np.full(len(p_values), np.nan)
+    result[finite] = adjust_finite_p_values(p_values[finite], method)
+    return result
+
+
+def adjust_finite_p_values(p_values: np.ndarray, method: str) -> np.ndarray:
+    """
+    Corrige p-valores sem NaN (ver adjust_p_values)
+    """
+
+    m = len(p_values)
+    if m == 0 or method == "bonferroni":
+        return np.minimum(p_values * m, 1.0)
+
+    order = np.argsort(p_values, kind="stable")
+    sorted_p = p_values[order]
+    if method == "holm":
+        # p_(i) * (m - i + 1), forçado a ser não decrescente
+        adjusted = np.maximum.accumulate(sorted_p * (m - np.arange(m)))
+    else:
+        # p_(i) * m / i, forçado a ser não crescente a partir do maior
+        adjusted = np.minimum.accumulate((sorted_p * m / np.arange(1, m + 1))[::-1])[::-1]
+
+    result = np.empty(m)
+    result[order] = np.minimum(adjusted, 1.0)
+    return result
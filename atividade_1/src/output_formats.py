@@ -0,0 +1,114 @@
+"""
+Módulo para salvar gráficos e tabelas nos formatos de saída configurados
+
+As opções vêm da seção [outputs] da configuração do pipeline (ver config.py):
+gráficos em "png" (raster) e/ou "svg"/"pdf" (vetoriais), com prévias PNG de baixa
+resolução opcionais, e tabelas em CSV (sempre gerado, pois os gráficos o leem),
+"json" e/ou "parquet".
+"""
+
+import csv
+import json
+import os
+
+import matplotlib.pyplot as plt
+
+# Formatos de gráfico aceitos em options["figure_formats"]
+FIGURE_FORMATS = ["png", "svg", "pdf"]
+
+
+def output_path(options: dict, filename: str) -> str:
+    """
+    Caminho de um arquivo dentro do diretório de saída (options["directory"])
+
+    @param options: Seção [outputs] da configuração
+    @param filename: Nome do arquivo
+    """
+
+    return os.path.join(options["directory"], filename)
+
+
+def save_figure(name: str, options: dict, dpi=None, **savefig_kwargs) -> None:
+    """
+    Salva a figura atual em todos os formatos de options["figure_formats"]
+
+    @param name: Nome do arquivo sem a extensão, dentro do diretório de saída
+    @param options: Seção [outputs] da configuração
+    @param dpi: Resolução dos formatos raster (por padrão, options["figure_dpi"]). Use
+        "figure" para manter a resolução da própria figura
+    @param savefig_kwargs: Demais argumentos repassados ao plt.savefig (ex.: bbox_inches)
+    """
+
+    dpi = options["figure_dpi"] if dpi is None else dpi
+    path = output_path(options, name)
+    for figure_format in options["figure_formats"]:
+        plt.savefig(f"{path}.{figure_format}", dpi=dpi, format=figure_format, **savefig_kwargs)
+
+    if options["previews"]:
+        plt.savefig(f"{path}_preview.png", dpi=options["preview_dpi"], format="png", **savefig_kwargs)
+
+
+def write_csv(path: str, columns: dict[str, list]) -> None:
+    """
+    Escreve as colunas em um arquivo CSV, linha a linha, sem construir um DataFrame
+
+    @param path: Caminho do arquivo
+    @param columns: Mapeia nome da coluna -> lista de valores (todas com o mesmo tamanho)
+    """
+
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file, lineterminator="\n")
+        writer.writerow(columns.keys())
+        writer.writerows(zip(*columns.values()))
+
+
+def write_json(path: str, columns: dict[str, list]) -> None:
+    """
+    Escreve as colunas em um arquivo JSON no formato {coluna: [valores]}
+    """
+
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(columns, file, ensure_ascii=False)
+
+
+def write_parquet(path: str, columns: dict[str, list]) -> None:
+    """
+    Escreve as colunas em um arquivo Parquet (requer o pacote pyarrow)
+    """
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise ImportError(
+            "O formato parquet requer o pyarrow. Instale com: pip install pyarrow"
+        ) from error
+
+    pq.write_table(pa.table(columns), path)
+
+
+# Mapeia formato da tabela -> função que a escreve
+TABLE_WRITERS = {
+    "csv": write_csv,
+    "json": write_json,
+    "parquet": write_parquet,
+}
+
+
+def save_table(name: str, columns: dict[str, list], options: dict) -> None:
+    """
+    Salva a tabela como CSV e nos demais formatos de options["table_formats"]
+
+    @param name: Nome do arquivo sem a extensão, dentro do diretório de saída
+    @param columns: Mapeia nome da coluna -> lista de valores (todas com o mesmo tamanho)
+    @param options: Seção [outputs] da configuração
+    """
+
+    path = output_path(options, name)
+    for table_format in dict.fromkeys(["csv"] + options["table_formats"]):
+        if table_format not in TABLE_WRITERS:
+            raise ValueError(
+                f"Formato de tabela desconhecido: {table_format}. "
+                f"Opções: {', '.join(TABLE_WRITERS)}"
+            )
+        TABLE_WRITERS[table_format](f"{path}.{table_format}", columns)
@@ -0,0 +1,257 @@
+"""
+Módulo para a leitura paralela do CSV dos lançamentos
+
+O arquivo é dividido em faixas de bytes que terminam sempre em um fim de registro
+(quebras de linha dentro de campos entre aspas, como as listas de gêneros e descritores,
+não contam). Cada faixa é lida por um processo, que escreve os campos numéricos
+diretamente na sua fatia de um array em memória compartilhada; as colunas qualitativas
+voltam como vocabulário local + ids e são unificadas no processo principal.
+"""
+
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from dates import PARTIAL_DATE_POLICY
+from mmap_reader import parse_buffer, parse_mapped_file
+from records import (
+    READER,
+    TOKEN_COLUMNS,
+    ReleaseRecords,
+    TokenColumn,
+    load_records,
+    parse_rows,
+    project_columns,
+    projected_column_numbers,
+    projected_dtype,
+)
+
+SCAN_BLOCK_SIZE = 4 * 1024 * 1024  # Tamanho dos blocos lidos na busca pelos fins de registro
+MIN_CHUNK_SIZE = 1024 * 1024  # Faixas menores que isso não compensam um processo extra
+QUOTE = ord('"')
+NEWLINE = ord("\n")
+
+
+def find_record_ends(path: str, block_size: int = SCAN_BLOCK_SIZE) -> np.ndarray:
+    """
+    Encontra a posição (em bytes) da quebra de linha que encerra cada registro do CSV
+
+    Uma quebra de linha só encerra o registro se estiver fora de aspas, ou seja, se o
+    número de aspas antes dela for par. A contagem é feita bloco a bloco com o NumPy,
+    levando a paridade de um bloco para o seguinte.
+
+    @param path: Caminho do arquivo CSV
+    @param block_size: Tamanho de cada bloco lido
+    """
+
+    record_ends = []
+    parity = 0
+    offset = 0
+
+    with open(path, "rb") as file:
+        while block := file.read(block_size):
+            buffer = np.frombuffer(block, dtype=np.uint8)
+            quotes = np.cumsum(buffer == QUOTE)
+            outside_quotes = ((quotes + parity) & 1) == 0
+            record_ends.append(np.flatnonzero((buffer == NEWLINE) & outside_quotes) + offset)
+            parity = (parity + int(quotes[-1])) & 1
+            offset += len(block)
+
+    ends = np.concatenate(record_ends) if record_ends else np.empty(0, dtype=np.int64)
+    # O último registro pode não terminar com quebra de linha
+    if offset > 0 and (len(ends) == 0 or ends[-1] != offset - 1):
+        ends = np.append(ends, offset - 1)
+    return ends
+
+
+def split_chunks(record_ends: np.ndarray, workers: int) -> list[tuple[int, int, int, int]]:
+    """
+    Divide os registros (sem o cabeçalho) em faixas de tamanho parecido em bytes
+
+    @param record_ends: Posição do fim de cada registro (o primeiro é o cabeçalho)
+    @param workers: Número máximo de faixas
+
+    @return: Lista de (byte_inicial, byte_final, primeira_linha, número_de_linhas)
+    """
+
+    data_start = int(record_ends[0]) + 1
+    data_end = int(record_ends[-1]) + 1
+    ends = record_ends[1:]
+
+    workers = max(1, min(workers, (data_end - data_start) // MIN_CHUNK_SIZE + 1))
+    targets = np.linspace(data_start, data_end, workers + 1)[1:-1]
+    # Cada faixa termina no primeiro fim de registro a partir do alvo
+    cuts = np.searchsorted(ends, targets, side="left") + 1
+    row_cuts = np.unique(np.concatenate(([0], np.minimum(cuts, len(ends)), [len(ends)])))
+
+    chunks = []
+    for first_row, last_row in zip(row_cuts[:-1], row_cuts[1:]):
+        start = data_start if first_row == 0 else int(ends[first_row - 1]) + 1
+        end = int(ends[last_row - 1]) + 1
+        chunks.append((start, end, int(first_row), int(last_row - first_row)))
+    return chunks
+
+
+def parse_text_chunk(
+    path: str,
+    start: int,
+    end: int,
+    column_numbers: dict[str, int],
+    date_policy: str,
+) -> tuple[np.ndarray, dict[str, TokenColumn]]:
+    """
+    Lê uma faixa do CSV com o módulo csv, decodificando o texto
+
+    @return: Tupla (array estruturado com os campos numéricos, colunas qualitativas)
+    """
+
+    with open(path, "rb") as file:
+        file.seek(start)
+        text = file.read(end - start).decode("utf-8")
+
+    return parse_rows(csv.reader(io.StringIO(text)), column_numbers, date_policy)
+
+
+def parse_chunk(
+    path: str,
+    start: int,
+    end: int,
+    first_row: int,
+    n_rows: int,
+    total_rows: int,
+    shm_name: str,
+    column_numbers: dict[str, int],
+    n_columns: int,
+    date_policy: str,
+    reader: str = READER,
+) -> dict[str, tuple[list[str], np.ndarray, np.ndarray]]:
+    """
+    Lê uma faixa do CSV (executado em um processo separado)
+
+    Os campos numéricos são escritos nas linhas [first_row, first_row + n_rows) do array
+    compartilhado; as colunas qualitativas são devolvidas com vocabulário local. Com o
+    leitor "mmap", cada processo mapeia o arquivo e lê só os bytes da sua faixa.
+
+    @return: Mapeia coluna -> (vocabulário, ids, offsets)
+    """
+
+    if reader == "mmap":
+        chunk_values, chunk_tokens = parse_mapped_file(
+            path, lambda buffer: parse_buffer(buffer[start:end], column_numbers, n_columns, date_policy)
+        )
+    else:
+        chunk_values, chunk_tokens = parse_text_chunk(path, start, end, column_numbers, date_policy)
+
+    # Quem cria e remove a memória é o processo principal
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        rows = np.ndarray((total_rows,), dtype=chunk_values.dtype, buffer=shm.buf)
+        rows[first_row:first_row + n_rows] = chunk_values
+        del rows
+    finally:
+        shm.close()
+
+    return {
+        column: (token_column.vocabulary, token_column.ids, token_column.offsets)
+        for column, token_column in chunk_tokens.items()
+    }
+
+
+def merge_token_columns(chunk_results: list[dict], columns: list[str]) -> dict[str, TokenColumn]:
+    """
+    Une as colunas qualitativas das faixas, traduzindo os ids locais para ids globais
+
+    Os ids globais seguem a ordem de primeira aparição, como na leitura sequencial.
+    """
+
+    token_columns = {}
+    for column in columns:
+        token_ids: dict[str, int] = {}
+        ids_parts = []
+        offsets_parts = [np.zeros(1, dtype=np.int64)]
+        total_tokens = 0
+
+        for result in chunk_results:
+            vocabulary, ids, offsets = result[column]
+            # Tabela de tradução id local -> id global
+            translation = np.array(
+                [token_ids.setdefault(token, len(token_ids)) for token in vocabulary],
+                dtype=np.int32,
+            )
+            ids_parts.append(translation[ids] if len(ids) else ids)
+            offsets_parts.append(offsets[1:] + total_tokens)
+            total_tokens += len(ids)
+
+        token_columns[column] = TokenColumn(
+            vocabulary=list(token_ids),
+            ids=np.concatenate(ids_parts or [np.empty(0)]).astype(np.int32),
+            offsets=np.concatenate(offsets_parts),
+        )
+    return token_columns
+
+
+def load_records_parallel(
+    path: str,
+    date_policy: str = PARTIAL_DATE_POLICY,
+    workers: int | None = None,
+    reader: str = READER,
+    columns: list[str] | None = None,
+) -> ReleaseRecords:
+    """
+    Lê o arquivo CSV em paralelo e constrói os registros tipados dos lançamentos
+
+    @param path: Caminho do arquivo CSV
+    @param date_policy: Tratamento das datas parciais (ver dates.PARTIAL_DATE_POLICIES)
+    @param workers: Número de processos; se None, usa o número de núcleos
+    @param reader: Leitor usado em cada faixa (ver records.READERS)
+    @param columns: Colunas a carregar; se None, todas
+    """
+
+    columns = project_columns(columns)
+    dtype = projected_dtype(columns)
+    token_columns = [column for column in columns if column in TOKEN_COLUMNS]
+
+    record_ends = find_record_ends(path)
+
+    with open(path, "r", encoding="utf-8") as file:
+        header = next(csv.reader(file))
+    column_numbers = projected_column_numbers(header, columns)
+
+    total_rows = len(record_ends) - 1
+    if total_rows <= 0:
+        return ReleaseRecords(np.empty(0, dtype=dtype), merge_token_columns([], token_columns))
+
+    chunks = split_chunks(record_ends, workers or os.cpu_count() or 1)
+    if len(chunks) == 1:
+        # Arquivo pequeno: não compensa criar processos
+        return load_records(path, date_policy, reader=reader, columns=columns)
+
+    # O SharedMemory não aceita tamanho zero (ex.: quando só colunas qualitativas são pedidas)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, total_rows * dtype.itemsize))
+    try:
+        with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+            futures = [
+                executor.submit(
+                    parse_chunk, path, start, end, first_row, n_rows, total_rows,
+                    shm.name, column_numbers, len(header), date_policy, reader,
+                )
+                for start, end, first_row, n_rows in chunks
+            ]
+            chunk_results = [future.result() for future in futures]
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+
+    # Copia as linhas para memória própria: views de shm.buf deixariam de ser válidas
+    # quando o SharedMemory fosse fechado, mesmo que uma coluna ainda estivesse em uso
+    try:
+        rows = np.ndarray((total_rows,), dtype=dtype, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+    return ReleaseRecords(rows, merge_token_columns(chunk_results, token_columns))
@@ -0,0 +1,280 @@
+"""
+Módulo com o modelo tipado dos lançamentos lidos do CSV
+
+Os campos numéricos de cada lançamento ficam em um array estruturado do NumPy
+(id, data, média e número de resenhas, 24 bytes por linha). As variáveis qualitativas
+são codificadas por dicionário: cada texto distinto é guardado uma única vez no
+vocabulário, e as linhas referenciam seus ids em formato CSR (ids + offsets).
+"""
+
+import csv
+from typing import Iterable
+
+import numpy as np
+
+from dates import PARTIAL_DATE_POLICY, parse_dates
+
+RELEASE_ID_COLUMN = ""  # A primeira coluna do CSV (id do lançamento) não tem nome
+MULTI_VALUE_COLUMNS = ["primary_genres", "descriptors"]
+TOKEN_COLUMNS = ["artist_name", "primary_genres", "descriptors"]
+MISSING_VALUE = "NA"
+TRUNCATION_MARKER = ",..."  # Alguns descritores aparecem truncados com ",..."
+
+# Leitores disponíveis: "mmap" (bytes via mmap_reader) ou "csv" (módulo csv, texto decodificado)
+READERS = ("mmap", "csv")
+READER = "mmap"
+
+RELEASE_DTYPE = np.dtype([
+    ("release_id", np.int32),
+    ("release_date", "datetime64[D]"),
+    ("avg_rating", np.float64),
+    ("review_count", np.int32),
+])
+
+
+class TokenColumn:
+    """
+    Coluna qualitativa codificada por dicionário
+
+    Os ids da linha i são ids[offsets[i]:offsets[i + 1]], e o texto do id j é vocabulary[j].
+    """
+
+    __slots__ = ("vocabulary", "ids", "offsets")
+
+    def __init__(self, vocabulary: list[str], ids: np.ndarray, offsets: np.ndarray):
+        self.vocabulary = vocabulary
+        self.ids = ids
+        self.offsets = offsets
+
+    def counts(self) -> np.ndarray:
+        """
+        Número de ocorrências de cada id do vocabulário
+        """
+
+        return np.bincount(self.ids, minlength=len(self.vocabulary))
+
+    def row_index(self) -> np.ndarray:
+        """
+        Linha de origem de cada ocorrência (equivalente a "explodir" a coluna)
+        """
+
+        return np.repeat(np.arange(len(self.offsets) - 1), np.diff(self.offsets))
+
+    def tokens(self) -> list[str]:
+        """
+        Texto de cada ocorrência, na ordem das linhas
+        """
+
+        return [self.vocabulary[token_id] for token_id in self.ids]
+
+
+class ReleaseRecords:
+    """
+    Conjunto de lançamentos: array estruturado com os campos numéricos e
+    colunas qualitativas codificadas por dicionário
+    """
+
+    __slots__ = ("rows", "token_columns")
+
+    def __init__(self, rows: np.ndarray, token_columns: dict[str, TokenColumn]):
+        self.rows = rows
+        self.token_columns = token_columns
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, column: str):
+        """
+        Retorna o array de um campo numérico ou a TokenColumn de uma variável qualitativa
+        """
+
+        if column in self.token_columns:
+            return self.token_columns[column]
+        if column not in self.rows.dtype.names:
+            raise KeyError(f"A coluna {column} não foi carregada")
+        return self.rows[column]
+
+
+class TokenEncoder:
+    """
+    Constrói uma TokenColumn incrementalmente, atribuindo ids na ordem de aparição
+    """
+
+    __slots__ = ("token_ids", "ids", "offsets")
+
+    def __init__(self):
+        self.token_ids: dict[str, int] = {}  # Mapeia texto -> id
+        self.ids: list[int] = []
+        self.offsets: list[int] = [0]
+
+    def add_row(self, tokens: Iterable[str]) -> None:
+        for token in tokens:
+            token_id = self.token_ids.setdefault(token, len(self.token_ids))
+            self.ids.append(token_id)
+        self.offsets.append(len(self.ids))
+
+    def build(self) -> TokenColumn:
+        return TokenColumn(
+            vocabulary=list(self.token_ids),
+            ids=np.array(self.ids, dtype=np.int32),
+            offsets=np.array(self.offsets, dtype=np.int64),
+        )
+
+
+def split_tokens(column: str, value: str) -> list[str]:
+    """
+    Separa o texto de uma célula nos valores da variável qualitativa
+
+    @param column: Nome da coluna
+    @param value: Texto da célula
+    """
+
+    if value == MISSING_VALUE:
+        return []
+    if column not in MULTI_VALUE_COLUMNS:
+        return [value]
+    # Algumas entradas contêm múltiplos valores separados por vírgula
+    return [
+        token[:-len(TRUNCATION_MARKER)] if token.endswith(TRUNCATION_MARKER) else token
+        for token in value.split(", ")
+    ]
+
+
+def get_column_numbers(header: list[str], variables: list) -> dict[str, int]:
+    """
+    Função que dinamicamente obtém os números das colunas relevantes
+
+    @param header: Primeira linha do CSV
+    @param variables: Lista de variáveis cujas colunas queremos mapear
+    """
+
+    return {column: i for i, column in enumerate(header) if column in variables}
+
+
+def project_columns(columns: Iterable[str] | None = None) -> list[str]:
+    """
+    Valida as colunas pedidas e as devolve na ordem de RELEASE_DTYPE e TOKEN_COLUMNS
+
+    @param columns: Colunas a carregar; se None, todas
+    """
+
+    known_columns = list(RELEASE_DTYPE.names) + TOKEN_COLUMNS
+    if columns is None:
+        return known_columns
+
+    columns = set(columns)
+    unknown = columns.difference(known_columns)
+    if unknown:
+        raise ValueError(
+            f"Colunas desconhecidas: {', '.join(sorted(unknown))}. "
+            f"Opções: {', '.join(known_columns)}"
+        )
+    return [column for column in known_columns if column in columns]
+
+
+def projected_dtype(columns: Iterable[str]) -> np.dtype:
+    """
+    Array estruturado com apenas os campos numéricos presentes em columns
+    """
+
+    return np.dtype([(name, RELEASE_DTYPE[name]) for name in RELEASE_DTYPE.names if name in columns])
+
+
+def projected_column_numbers(header: list[str], columns: list[str]) -> dict[str, int]:
+    """
+    Mapeia as colunas projetadas para seus números no CSV
+
+    As chaves do resultado definem a projeção usada pelos leitores.
+
+    @param header: Primeira linha do CSV
+    @param columns: Colunas a carregar (ver project_columns)
+    """
+
+    # A coluna de id não tem nome no CSV
+    csv_names = [RELEASE_ID_COLUMN if column == "release_id" else column for column in columns]
+    column_numbers = get_column_numbers(header, csv_names)
+    if RELEASE_ID_COLUMN in column_numbers:
+        column_numbers["release_id"] = column_numbers.pop(RELEASE_ID_COLUMN)
+
+    missing = [column for column in columns if column not in column_numbers]
+    if missing:
+        raise ValueError(f"Colunas ausentes no CSV: {', '.join(missing)}")
+    return column_numbers
+
+
+def load_records(
+    path: str,
+    date_policy: str = PARTIAL_DATE_POLICY,
+    workers: int = 1,
+    reader: str = READER,
+    columns: Iterable[str] | None = None,
+) -> ReleaseRecords:
+    """
+    Lê o arquivo CSV e constrói os registros tipados dos lançamentos
+
+    @param path: Caminho do arquivo CSV
+    @param date_policy: Tratamento das datas parciais (ver dates.PARTIAL_DATE_POLICIES)
+    @param workers: Número de processos de leitura; acima de 1, usa parallel_reader
+    @param reader: Leitor usado (ver READERS)
+    @param columns: Colunas a carregar; se None, todas. As demais nem são convertidas
+    """
+
+    if reader not in READERS:
+        raise ValueError(f"Leitor desconhecido: {reader}. Opções: {', '.join(READERS)}")
+    columns = project_columns(columns)
+
+    # Importados aqui porque os dois módulos dependem deste
+    if workers > 1:
+        from parallel_reader import load_records_parallel
+
+        return load_records_parallel(path, date_policy, workers, reader, columns)
+    if reader == "mmap":
+        from mmap_reader import load_records_mmap
+
+        return load_records_mmap(path, date_policy, columns)
+
+    with open(path, "r", encoding="utf-8") as file:
+        csv_reader = csv.reader(file)
+        column_numbers = projected_column_numbers(next(csv_reader), columns)
+        rows, token_columns = parse_rows(csv_reader, column_numbers, date_policy)
+
+    return ReleaseRecords(rows, token_columns)
+
+
+def parse_rows(
+    csv_rows: Iterable[list[str]],
+    column_numbers: dict[str, int],
+    date_policy: str = PARTIAL_DATE_POLICY,
+) -> tuple[np.ndarray, dict[str, TokenColumn]]:
+    """
+    Converte as linhas já separadas pelo módulo csv nas colunas projetadas
+
+    @param csv_rows: Linhas do CSV (sem o cabeçalho)
+    @param column_numbers: Mapeia coluna -> número da coluna no CSV (ver projected_column_numbers)
+    @param date_policy: Tratamento das datas parciais (ver dates.PARTIAL_DATE_POLICIES)
+
+    @return: Tupla (array estruturado com os campos numéricos, colunas qualitativas)
+    """
+
+    dtype = projected_dtype(column_numbers)
+    numeric_values: dict[str, list[str]] = {column: [] for column in dtype.names}
+    encoders = {column: TokenEncoder() for column in TOKEN_COLUMNS if column in column_numbers}
+    n_rows = 0
+
+    for row in csv_rows:
+        for column, values in numeric_values.items():
+            values.append(row[column_numbers[column]])
+        for column, encoder in encoders.items():
+            encoder.add_row(split_tokens(column, row[column_numbers[column]]))
+        n_rows += 1
+
+    # As conversões de texto são feitas de uma só vez, por coluna
+    rows = np.empty(n_rows, dtype=dtype)
+    for column, values in numeric_values.items():
+        if column == "release_date":
+            rows[column] = parse_dates(values, date_policy)
+        else:
+            rows[column] = np.array(values).astype(dtype[column])
+
+    token_columns = {column: encoder.build() for column, encoder in encoders.items()}
+    return rows, token_columns
@@ -0,0 +1,236 @@
+"""
+Módulo com medidas de resumo robustas e detecção de outliers
+
+Todas as medidas partem da mesma coluna ordenada (uma única ordenação por variável):
+quantis e cercas são lidos por posição, as médias aparada e winsorizada são somas de
+fatias, e o MAD usa np.partition, que é O(n). Como os valores fora de qualquer par de
+cercas (IQR ou z-score) formam um prefixo e um sufixo da coluna ordenada, os outliers
+são encontrados por busca binária, e seus ids vêm da mesma permutação da ordenação.
+"""
+
+import numpy as np
+
+from config import load_config, load_planned_records
+from frequency_tables import translation
+from output_formats import output_path, save_table
+from records import ReleaseRecords
+
+# Fator que torna o MAD um estimador consistente do desvio padrão em dados normais
+MAD_NORMAL_SCALE = 1.4826
+
+
+def sorted_quantile(sorted_values: np.ndarray, q: float) -> float:
+    """
+    Quantil q (entre 0 e 1) de uma coluna já ordenada, com interpolação linear
+    (o mesmo método padrão de np.percentile)
+    """
+
+    position = (len(sorted_values) - 1) * q
+    lower = int(np.floor(position))
+    upper = min(lower + 1, len(sorted_values) - 1)
+    weight = position - lower
+    low, high = sorted_values[lower], sorted_values[upper]
+    # Interpola a partir do vizinho mais próximo, como o NumPy, para dar o mesmo resultado
+    if weight >= 0.5:
+        return float(high - (high - low) * (1 - weight))
+    return float(low + (high - low) * weight)
+
+
+def median_absolute_deviation(sorted_values: np.ndarray) -> float:
+    """
+    Mediana dos desvios absolutos em relação à mediana (MAD)
+    """
+
+    deviations = np.abs(sorted_values - sorted_quantile(sorted_values, 0.5))
+    n = len(deviations)
+    middle = n // 2
+    if n % 2 == 1:
+        return float(np.partition(deviations, middle)[middle])
+    # Com n par, a mediana é a média dos dois elementos centrais
+    partitioned = np.partition(deviations, [middle - 1, middle])
+    return float((partitioned[middle - 1] + partitioned[middle]) / 2)
+
+
+def trimmed_mean(sorted_values: np.ndarray, proportion: float) -> float:
+    """
+    Média descartando a fração proportion dos menores e dos maiores valores
+
+    @param sorted_values: Coluna ordenada
+    @param proportion: Fração cortada de cada extremo (entre 0 e 0.5)
+    """
+
+    cut = int(proportion * len(sorted_values))
+    return float(sorted_values[cut:len(sorted_values) - cut].mean())
+
+
+def winsorized_mean(sorted_values: np.ndarray, proportion: float) -> float:
+    """
+    Média substituindo a fração proportion de cada extremo pelo valor mais próximo mantido
+
+    @param sorted_values: Coluna ordenada
+    @param proportion: Fração substituída em cada extremo (entre 0 e 0.5)
+    """
+
+    n = len(sorted_values)
+    cut = int(proportion * n)
+    kept = sorted_values[cut:n - cut]
+    total = kept.sum() + cut * (kept[0] + kept[-1])
+    return float(total / n)
+
+
+def iqr_fences(sorted_values: np.ndarray, factor: float = 1.5) -> tuple[float, float]:
+    """
+    Cercas de Tukey: Q1 - factor * IQR e Q3 + factor * IQR
+    """
+
+    q1 = sorted_quantile(sorted_values, 0.25)
+    q3 = sorted_quantile(sorted_values, 0.75)
+    iqr = q3 - q1
+    return q1 - factor * iqr, q3 + factor * iqr
+
+
+def zscore_fences(sorted_values: np.ndarray, threshold: float = 3.0) -> tuple[float, float]:
+    """
+    Valores com |z| > threshold, em que z = (x - média) / desvio padrão, ficam fora destas cercas
+    """
+
+    mean = float(sorted_values.mean())
+    std = float(sorted_values.std())
+    return mean - threshold * std, mean + threshold * std
+
+
+def outside_fences(sorted_values: np.ndarray, low: float, high: float) -> tuple[int, int]:
+    """
+    Posições que separam os valores fora das cercas: sorted_values[:start] < low e
+    sorted_values[end:] > high
+    """
+
+    start = int(np.searchsorted(sorted_values, low, side="left"))
+    end = int(np.searchsorted(sorted_values, high, side="right"))
+    return start, max(start, end)
+
+
+def flagged_positions(n: int, start: int, end: int) -> np.ndarray:
+    """
+    Posições (na coluna ordenada) fora das cercas
+    """
+
+    return np.concatenate((np.arange(start), np.arange(end, n)))
+
+
+def robust_summary(sorted_values: np.ndarray, options: dict) -> dict:
+    """
+    Calcula as medidas robustas e as cercas de outliers de uma coluna ordenada
+
+    @param sorted_values: Coluna ordenada (float)
+    @param options: Seção [robust_statistics] da configuração
+
+    @return: Dicionário com as medidas, as cercas e as posições dos valores fora delas
+    """
+
+    proportion = options["trim_proportion"]
+    mad = median_absolute_deviation(sorted_values)
+    iqr_low, iqr_high = iqr_fences(sorted_values, options["iqr_factor"])
+    z_low, z_high = zscore_fences(sorted_values, options["zscore_threshold"])
+
+    return {
+        "mean": float(sorted_values.mean()),
+        "std": float(sorted_values.std()),
+        "median": sorted_quantile(sorted_values, 0.5),
+        "mad": mad,
+        "scaled_mad": MAD_NORMAL_SCALE * mad,
+        "trimmed_mean": trimmed_mean(sorted_values, proportion),
+        "winsorized_mean": winsorized_mean(sorted_values, proportion),
+        "iqr_fences": (iqr_low, iqr_high),
+        "iqr_outliers": outside_fences(sorted_values, iqr_low, iqr_high),
+        "zscore_fences": (z_low, z_high),
+        "zscore_outliers": outside_fences(sorted_values, z_low, z_high),
+    }
+
+
+def outlier_table(
+    sorted_column: np.ndarray, sorted_ids: np.ndarray, summary: dict, variable: str
+) -> dict[str, list]:
+    """
+    Monta a tabela dos lançamentos sinalizados por qualquer um dos métodos
+
+    @param sorted_column: Coluna ordenada, no tipo original (ex.: contagens inteiras)
+    @param sorted_ids: Id do lançamento de cada posição da coluna ordenada
+    @param summary: Resultado de robust_summary
+    @param variable: Nome da variável
+
+    @return: Colunas da tabela, na ordem crescente do valor
+    """
+
+    n = len(sorted_column)
+    iqr_start, iqr_end = summary["iqr_outliers"]
+    z_start, z_end = summary["zscore_outliers"]
+    # Os dois métodos sinalizam prefixos e sufixos; a união também é um prefixo e um sufixo
+    positions = flagged_positions(n, max(iqr_start, z_start), min(iqr_end, z_end))
+
+    values = sorted_column[positions]
+    std = summary["std"]
+    zscores = (values - summary["mean"]) / std if std > 0 else np.zeros(len(values))
+
+    return {
+        "ID do lançamento": sorted_ids[positions].tolist(),
+        translation[variable]: values.tolist(),
+        "Z-score": np.round(zscores, 3).tolist(),
+        "Fora das cercas IQR": ((positions < iqr_start) | (positions >= iqr_end)).tolist(),
+        "Fora das cercas do z-score": ((positions < z_start) | (positions >= z_end)).tolist(),
+    }
+
+
+def get_robust_statistics(records: ReleaseRecords | None = None, config: dict | None = None) -> None:
+    """
+    Calcula as medidas robustas das variáveis em robust_statistics.variables, salva o resumo em
+    estatisticas_robustas.txt e a lista de lançamentos sinalizados em <variável>_outliers,
+    no diretório de saída
+
+    @param records: Registros dos lançamentos; se None, são lidos do CSV
+    @param config: Configuração do pipeline; se None, é lida de config.CONFIG_PATH
+    """
+
+    if config is None:
+        config = load_config()
+    if records is None:
+        records = load_planned_records(config, ["robust_statistics"])
+    options = config["robust_statistics"]
+    proportion = options["trim_proportion"]
+
+    with open(output_path(config["outputs"], "estatisticas_robustas.txt"), "w", encoding="utf-8") as f:
+        for variable in options["variables"]:
+            column = records[variable]
+            if len(column) == 0:
+                continue
+
+            # Uma única ordenação por variável; a permutação leva cada posição ao seu lançamento
+            order = np.argsort(column, kind="stable")
+            sorted_column = column[order]
+            sorted_values = sorted_column.astype(float)
+            summary = robust_summary(sorted_values, options)
+
+            n = len(sorted_values)
+            iqr_start, iqr_end = summary["iqr_outliers"]
+            z_start, z_end = summary["zscore_outliers"]
+            f.write(f"\nEstatísticas robustas para {variable}:\n")
+            f.write(f"Mediana: {summary['median']}\n")
+            f.write(f"Desvio Absoluto Mediano (MAD): {summary['mad']}\n")
+            f.write(f"MAD normalizado ({MAD_NORMAL_SCALE} * MAD): {summary['scaled_mad']}\n")
+            f.write(f"Média Aparada ({proportion:.0%}): {summary['trimmed_mean']}\n")
+            f.write(f"Média Winsorizada ({proportion:.0%}): {summary['winsorized_mean']}\n")
+            f.write(
+                f"Cercas IQR ({options['iqr_factor']} * IQR): {summary['iqr_fences'][0]} a "
+                f"{summary['iqr_fences'][1]} ({iqr_start + n - iqr_end} outliers)\n"
+            )
+            f.write(
+                f"Cercas do z-score (|z| > {options['zscore_threshold']}): {summary['zscore_fences'][0]} a "
+                f"{summary['zscore_fences'][1]} ({z_start + n - z_end} outliers)\n"
+            )
+
+            table = outlier_table(sorted_column, records["release_id"][order], summary, variable)
+            save_table(f"{translation[variable]}_outliers", table, config["outputs"])
+
+
+if __name__ == "__main__":
+    get_robust_statistics()
@@ -1,9 +1,12 @@
-import math
-from collections import Counter
-from typing import Iterable
-import csv
+import json
 import numpy as np
 
+from config import load_config, load_planned_records
+from dates import date_offsets, date_years, offsets_to_strings
+from output_formats import output_path
+from records import TOKEN_COLUMNS, ReleaseRecords
+from robust_statistics import iqr_fences, outside_fences, sorted_quantile
+
 #!/usr/bin/env python3
 """
 Este script calcula estatísticas descritivas para um conjunto de dados.
@@ -12,96 +15,54 @@ medidas posicionais (quartis, percentis)
 e medidas de dispersão (amplitude, variância, desvio padrão, intervalo interquartílico e coeficiente de variação).
 """
 
-qualitative_vars = ["artist_name", "primary_genres", "descriptors"]
-quantitative_vars = ["release_date", "avg_rating", "review_count"]
-data: dict[str, set[str]] = {
-column: set() for column in (qualitative_vars + quantitative_vars)
-}  # Mapeia coluna -> conjunto de dados lidos
-data_occurences: dict[str, int] = {}  # Mapeia dado -> número de ocorrências
-
 def calculate_mean(data, key):
-    """Retorna a média da lista de dados."""
+    """Retorna a média dos dados.
+    Para release_date, data tem o número de dias desde 1970-01-01 e o resultado é uma data."""
+    mean = data.mean()
     if key == "release_date":
-        data_array = np.array(data, dtype='datetime64[D]').view('i8')
-        mean = (data_array
-            .mean()
-            .astype('datetime64[D]'))
-        return mean
-    data = list(map(float, data))  # Converte os dados para float
-    return sum(data) / len(data)
+        return mean.astype('datetime64[D]')
+    return float(mean)
 
 def calculate_median(data, key):
-    """Retorna a mediana da lista de dados."""
+    """Retorna a mediana dos dados."""
+    median = np.median(data)
     if key == "release_date":
-        median = np.datetime64(
-            int(np.median(np.array(data, dtype='datetime64[D]').view('i8'))), 'D'
-        )
-        return median
-    data = list(map(float, data))  # Converte os dados para float
-    sorted_data = sorted(data)
-    n = len(sorted_data)
-    mid = n // 2
-    if n % 2 == 0:
-        return (sorted_data[mid - 1] + sorted_data[mid]) / 2
-    return sorted_data[mid]
+        return np.datetime64(int(median), 'D')
+    return float(median)
 
 def calculate_mode(data, key):
-    """Retorna a(s) moda(s) da lista de dados como uma lista.
-    Se todos os números ocorrerem igualmente, retorna toda a lista ordenada."""
-    if key != "release_date" and key not in qualitative_vars:
-        data = list(map(float, data))
-    count = Counter(data)
-    max_occurrence = max(count.values())
-    modes = [x for x, occ in count.items() if occ == max_occurrence]
-    return sorted(modes)
+    """Retorna a(s) moda(s) dos dados como uma lista ordenada.
+    Para variáveis qualitativas, data é a TokenColumn e as modas saem das contagens do vocabulário."""
+    if key in TOKEN_COLUMNS:
+        counts = data.counts()
+        return sorted(data.vocabulary[token_id] for token_id in np.flatnonzero(counts == counts.max()).tolist())
+    values, counts = np.unique(data, return_counts=True)
+    modes = values[counts == counts.max()]
+    if key == "release_date":
+        return offsets_to_strings(modes).tolist()
+    return modes.astype(float).tolist()
 
 def calculate_percentile(data, percentile, key):
-    """Retorna o percentil informado da lista de dados.
+    """Retorna o percentil informado dos dados.
     Utiliza interpolação linear entre posições mais próximas."""
     if not 0 <= percentile <= 100:
         raise ValueError("O percentil deve estar entre 0 e 100")
+    value = np.percentile(data, percentile)
     if key == "release_date":
-        value = np.datetime64(
-            int(np.percentile(np.array(data, dtype='datetime64[D]').view('i8'), percentile)), 'D'
-        )
-        return value
-    data = list(map(float, data))  # Converte os dados para float
-    sorted_data = sorted(data)
-    n = len(sorted_data)
-    # Calcula a posição do ranking
-    rank = (n - 1) * (percentile / 100)
-    lower = math.floor(rank)
-    upper = math.ceil(rank)
-    # Se o ranking for inteiro, retorna o valor diretamente
-    if lower == upper:
-        return sorted_data[int(rank)]
-    # Caso contrário, interpola entre os dois valores vizinhos
-    lower_value = sorted_data[lower]
-    upper_value = sorted_data[upper]
-    weight = rank - lower
-    return lower_value + weight * (upper_value - lower_value)
+        return np.datetime64(int(value), 'D')
+    return float(value)
 
 def calculate_quartiles(data, key):
-    """Retorna o primeiro (Q1), segundo (Q2/Mediana) e terceiro (Q3) quartis da lista de dados."""
-    if key == "release_date":
-        Q1 = np.datetime64(
-            int(np.percentile(np.array(data, dtype='datetime64[D]').view('i8'), 25)), 'D'
-        )
-        Q2 = calculate_median(data, key)
-        Q3 = np.datetime64(
-            int(np.percentile(np.array(data, dtype='datetime64[D]').view('i8'), 75)), 'D'
-        )
-        return Q1, Q2, Q3
-
+    """Retorna o primeiro (Q1), segundo (Q2/Mediana) e terceiro (Q3) quartis dos dados."""
     Q1 = calculate_percentile(data, 25, key)
     Q2 = calculate_median(data, key)
     Q3 = calculate_percentile(data, 75, key)
     return Q1, Q2, Q3
 
 def calculate_decil(data, decil_index, key):
-    """Retorna o decil informado da lista de dados.
+    """Retorna o decil informado dos dados.
     
-    @param data: Lista de dados numéricos.
+    @param data: Array com os dados numéricos.
     @param decil_index: Índice do decil (inteiro de 1 a 9).
     @return: Valor do decil calculado utilizando o percentil correspondente.
     """
@@ -111,139 +72,152 @@ def calculate_decil(data, decil_index, key):
     return calculate_percentile(data, decil_index * 10, key)
 
 def calculate_range(data, key):
-    """Retorna a amplitude (máximo - mínimo) da lista de dados."""
+    """Retorna a amplitude (máximo - mínimo) dos dados."""
+    data_range = data.max() - data.min()
     if key == "release_date":
-        data_array = np.array(data, dtype='datetime64[D]')
-        return np.timedelta64(data_array.max() - data_array.min(), 'D')
-    data = list(map(float, data))  # Converte os dados para float
-    return max(data) - min(data)
+        return np.timedelta64(int(data_range), 'D')
+    return float(data_range)
 
 def calculate_variance(data, key):
-    """Retorna a variância populacional da lista de dados."""
-    if key == "release_date":
-        data_array = np.array(data, dtype='datetime64[D]').view('i8')
-        mean = data_array.mean()
-        if mean == 0:
-            return float('inf')
-        std = data_array.std()
-        return std / mean
-    data = list(map(float, data))  # Converte os dados para float
-    mean_value = calculate_mean(data, key)
-    return sum((x - mean_value) ** 2 for x in data) / len(data)
+    """Retorna a variância populacional dos dados (para datas, em dias ao quadrado)."""
+    return float(data.var())
 
 def calculate_standard_deviation(data, key):
-    """Retorna o desvio padrão populacional da lista de dados."""
+    """Retorna o desvio padrão populacional dos dados."""
+    std = data.std()
     if key == "release_date":
-        data_array = np.array(data, dtype='datetime64[D]').view('i8')
-        std_seconds = np.std(data_array)
-        return np.timedelta64(int(std_seconds), 'D') 
-    data = list(map(float, data))  # Converte os dados para float
-    return math.sqrt(calculate_variance(data, key))
+        return np.timedelta64(int(std), 'D')
+    return float(std)
 
 def calculate_interquartile_range(data, key):
-    """Retorna o intervalo interquartílico (IQR) da lista de dados."""
+    """Retorna o intervalo interquartílico (IQR) dos dados."""
+    Q1, Q3 = np.percentile(data, [25, 75])
     if key == "release_date":
-        data_array = np.array(data, dtype='datetime64[D]').view('i8')
-        Q1 = np.percentile(data_array, 25)
-        Q3 = np.percentile(data_array, 75)
         return np.timedelta64(int(Q3 - Q1), 'D')
-    Q1, _, Q3 = calculate_quartiles(data, key)
-    return Q3 - Q1
+    return float(Q3 - Q1)
 
 def calculate_coefficient_of_variation(data, key):
-    """Retorna o coeficiente de variação (desvio padrão / média) da lista de dados."""
-    mean_value = calculate_mean(data, key)
-    if mean_value == 0 or mean_value == "1970-01-01T00:00:00":
+    """Retorna o coeficiente de variação (desvio padrão / média) dos dados.
+    Para datas, usa o número de dias desde 1970-01-01."""
+    mean = data.mean()
+    if mean == 0:
         return float('inf')
-    if key == "release_date":
-        data_array = np.array(data, dtype='datetime64[D]').view('i8')
-        mean = data_array.mean()
-        if mean == 0:
-            return float('inf')
-        std = data_array.std()
-        return std / mean  
-    return calculate_standard_deviation(data, key) / mean_value
-
-def get_column_numbers(reader: Iterable[list[str]], variables: list) -> dict[str, int]:
-    """
-    Função que dinamicamente obtém os números das colunas relevantes
-
-    @param reader: Objeto CSV reader
-    @param variables: Lista de variáveis cujas colunas queremos mapear
+    return float(data.std() / mean)
+
+def calculate_boxplot_stats(data, label=""):
+    """Retorna as estatísticas de um boxplot no formato aceito por Axes.bxp.
+
+    Os bigodes vão até o valor mais extremo dentro de 1.5 * IQR dos quartis; apenas
+    os valores além desses limites são mantidos como outliers (fliers)."""
+    data_array = np.sort(np.asarray(data, dtype=float))
+    Q1, median, Q3 = (sorted_quantile(data_array, q) for q in (0.25, 0.5, 0.75))
+    # Como os dados estão ordenados, os limites são encontrados por busca binária
+    start, end = outside_fences(data_array, *iqr_fences(data_array))
+    fliers = np.concatenate((data_array[:start], data_array[end:]))
+    return {
+        "label": label,
+        "mean": float(data_array.mean()),
+        "med": float(median),
+        "q1": float(Q1),
+        "q3": float(Q3),
+        "whislo": float(data_array[start]) if start < end else float(Q1),
+        "whishi": float(data_array[end - 1]) if start < end else float(Q3),
+        "fliers": fliers.tolist(),
+    }
+
+def get_boxplot_statistics(records: ReleaseRecords, config: dict):
     """
+    Calcula as estatísticas de boxplot da média das avaliações: geral, por gênero primário
+    e por década de lançamento. Salva o resultado em boxplot_stats.json, no diretório de saída
 
-    column_numbers = {}  # Mapeia nome da coluna -> número da coluna
-    for i, column in enumerate(next(reader)):
-        if column in variables:
-            column_numbers[column] = i
-    return column_numbers
+    Só entram nos boxplots por gênero os summary_statistics.boxplot_top_genres gêneros
+    mais frequentes, com pelo menos summary_statistics.boxplot_min_count lançamentos.
 
-def get_csv_data() -> None:
-    """
-    Função que lê o arquivo CSV e armazena os dados relevantes nos dicionários (data e data_occurences)
+    @param records: Registros dos lançamentos
+    @param config: Configuração do pipeline
     """
 
-    with open("assets/rym_clean1.csv", "r") as file:
-        reader = csv.reader(file)
-        column_numbers = get_column_numbers(
-            reader=reader, variables=(qualitative_vars + quantitative_vars)
-        )
-
-        for row in reader:
-            for column_name, column_number in column_numbers.items():
-                row_data = row[column_number]  # Obtém o dado da coluna correspondente
-
-                if column_name in ["primary_genres", "descriptors"]:
-                    row_data = row_data.split(
-                        ", "
-                    )  # Algumas entradas contêm múltiplos valores separados por vírgula
-                else:
-                    row_data = [row_data]
-
-                for data_entry in row_data:
-                    data[column_name].add(
-                        data_entry
-                    )  # Adiciona o dado ao conjunto correspondente (evitando duplicatas)
-                    data_occurences[data_entry] = (
-                        data_occurences.get(data_entry, 0) + 1
-                    )  # Atualiza o número de ocorrências do dado
-
+    options = config["summary_statistics"]
+
+    ratings = records["avg_rating"]
+    release_dates = records["release_date"]
+
+    # Cada ocorrência de gênero aponta para a linha (e portanto a avaliação) de origem
+    genres = records["primary_genres"]
+    genre_ratings = ratings[genres.row_index()]
+    genre_counts = genres.counts()
+
+    # Mantém apenas os gêneros mais frequentes
+    frequent_genres = sorted(
+        (genre_id for genre_id, count in enumerate(genre_counts) if count >= options["boxplot_min_count"]),
+        key=lambda genre_id: (-genre_counts[genre_id], genres.vocabulary[genre_id]),
+    )[:options["boxplot_top_genres"]]
+
+    # Lançamentos sem data ficam fora dos boxplots por década
+    has_date = ~np.isnat(release_dates)
+    decades = date_years(release_dates[has_date]) // 10 * 10
+    dated_ratings = ratings[has_date]
+
+    boxplot_stats = {
+        # Sem nenhum lançamento, o boxplot geral também fica vazio
+        "geral": [calculate_boxplot_stats(ratings, "Média das avaliações")] if len(ratings) else [],
+        "genero": [
+            calculate_boxplot_stats(genre_ratings[genres.ids == genre_id], genres.vocabulary[genre_id])
+            for genre_id in frequent_genres
+        ],
+        "decada": [
+            calculate_boxplot_stats(dated_ratings[decades == decade], f"{decade}s")
+            for decade in np.unique(decades).tolist()
+        ],
+    }
+
+    with open(output_path(config["outputs"], "boxplot_stats.json"), "w", encoding="utf-8") as f:
+        json.dump(boxplot_stats, f, ensure_ascii=False)
+
+def get_summary_statistics(records: ReleaseRecords | None = None, config: dict | None = None):
+    """
+    Calcula as medidas de resumo das variáveis configuradas e salva em estatisticas_resumo.txt,
+    no diretório de saída
 
-def get_summary_statistics():
-    get_csv_data()
+    @param records: Registros dos lançamentos; se None, são lidos do CSV
+    @param config: Configuração do pipeline; se None, é lida de config.CONFIG_PATH
+    """
+    if config is None:
+        config = load_config()
+    if records is None:
+        records = load_planned_records(config, ["summary_statistics"])
     total_data = {}
-    variables = quantitative_vars + qualitative_vars
-    for i in range(len(variables)):
-        total_data[variables[i]] = []
-    for key, value in data_occurences.items():
-        for data_key, dataset in data.items():
-            if key in dataset:
-                key_aux = key
-                if ",..." in key:
-                    key_aux = key[:-(len(",..."))]
-                for i in range(value):
-                    total_data[data_key].append(key_aux)
-    with open("outputs/estatisticas_resumo.txt", "w", encoding="utf-8") as f:
+    for key in config["variables"]["quantitative"]:
+        if key == "release_date":
+            # Datas viram o número de dias desde 1970-01-01 (as NaT são descartadas)
+            total_data[key] = date_offsets(records[key])
+        else:
+            total_data[key] = records[key]
+    for key in config["variables"]["qualitative"]:
+        total_data[key] = records[key]
+    with open(output_path(config["outputs"], "estatisticas_resumo.txt"), "w", encoding="utf-8") as f:
         for key, dataset in total_data.items():
             f.write(f"\nEstatísticas para {key}:\n")
             # Se o dado for qualitativo, calcula apenas a moda
-            if key in qualitative_vars:
-                dataset_list = list(dataset)
-                mode_values = calculate_mode(dataset_list, key)
+            if key in TOKEN_COLUMNS:
+                if len(dataset.ids) == 0:
+                    f.write("Nenhum valor válido\n")
+                    continue
+                mode_values = calculate_mode(dataset, key)
                 f.write(f"Moda(s): {mode_values}\n")
                 continue
-            # Se o dado for qualitativo, não faz sentido calcular média, mediana, etc.
-            dataset_list = list(dataset)  # Converte os dados para float
-            #if key == "release_date":
-            mean_value = calculate_mean(dataset_list, key)
-            median_value = calculate_median(dataset_list, key)
-            mode_values = calculate_mode(dataset_list, key)
-            Q1, Q2, Q3 = calculate_quartiles(dataset_list, key)
-            data_range = calculate_range(dataset_list, key)
-            variance_value = calculate_variance(dataset_list, key)
-            std_deviation = calculate_standard_deviation(dataset_list, key)
-            iqr = calculate_interquartile_range(dataset_list, key)
-            coefficient_of_variation = calculate_coefficient_of_variation(dataset_list, key)
+            if len(dataset) == 0:
+                f.write("Nenhum valor válido\n")
+                continue
+            mean_value = calculate_mean(dataset, key)
+            median_value = calculate_median(dataset, key)
+            mode_values = calculate_mode(dataset, key)
+            Q1, Q2, Q3 = calculate_quartiles(dataset, key)
+            data_range = calculate_range(dataset, key)
+            variance_value = calculate_variance(dataset, key)
+            std_deviation = calculate_standard_deviation(dataset, key)
+            iqr = calculate_interquartile_range(dataset, key)
+            coefficient_of_variation = calculate_coefficient_of_variation(dataset, key)
             f.write(f"Média: {mean_value}\n")
             f.write(f"Mediana: {median_value}\n")
             f.write(f"Moda(s): {mode_values}\n")
@@ -254,6 +228,8 @@ def get_summary_statistics():
             f.write(f"Intervalo Interquartílico (IQR): {iqr}\n")
             f.write(f"Coeficiente de Variação: {coefficient_of_variation}\n")
             # Percentil e decil dependem do index desejado
+    if config["summary_statistics"]["boxplots"]:
+        get_boxplot_statistics(records, config)
 
 if __name__ == "__main__":
     get_summary_statistics()
\ No newline at end of file
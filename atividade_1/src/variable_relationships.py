@@ -4,10 +4,11 @@ import numpy as np
 
 import seaborn as sns
 
-from frequency_tables import sturges_rule
-
-# Carregar o dataset
-data = pd.read_csv('assets/rym_clean1.csv')
+from config import load_config, load_planned_records
+from binning import sturges_rule
+from output_formats import save_figure
+from dates import date_years
+from records import ReleaseRecords
 
 def group_and_average(data, column, values_column, nbins):
     """
@@ -33,101 +34,115 @@ def group_and_average(data, column, values_column, nbins):
     return grouped
 
 
-def plot_variable_relationships():
-    """
-    Gera gráficos de relação entre variáveis.
+def compute_density_grid(x, y, gridsize: int, log_x: bool = False):
     """
-    # Configuração geral
-    plt.style.use('ggplot')
+    Agrega os pontos em uma grade 2D (histograma bidimensional) usando NumPy.
 
-    # Gráfico 1: Média das avaliações vs. Número de resenhas
-    plt.figure(figsize=(8, 6))
-    plt.scatter(data['review_count'], data['avg_rating'], alpha=0.7)
-    plt.xlabel('Número de Resenhas')
-    plt.ylabel('Média das Avaliações')
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig('outputs/Media_vs_Resenhas.png')
+    @param x: Valores do eixo X
+    @param y: Valores do eixo Y
+    @param gridsize: Número de classes em cada eixo
+    @param log_x: Se True, as classes do eixo X são igualmente espaçadas em escala logarítmica
 
-    # Gráfico 2: Data de lançamento vs. Média das avaliações
-    data['release_date'] = pd.to_datetime(data['release_date'])
-    nbins = sturges_rule(len(data))
-    grouped_data = group_and_average(data, 'release_date', 'avg_rating', nbins)
-    grouped_data.plot(kind='line', x='Intervalo', y='Média', figsize=(10, 6), marker='o')
-    plt.xlabel('Intervalos de Data de Lançamento')
-    plt.ylabel('Média das Avaliações')
-    plt.xticks(rotation=45, ha='right')  # Rotacionar os rótulos do eixo X
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig('outputs/Media_vs_Data.png')
+    @return: Tupla (contagens, bordas_x, bordas_y), com as bordas de X na escala original
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
 
-    # Gráfico 3: Gêneros primários vs. Média das avaliações
-    genre_data = data[['primary_genres', 'avg_rating']].dropna()
+    if log_x:
+        # Valores menores que 1 são agrupados na primeira classe
+        x = np.log10(np.maximum(x, 1))
 
-    # Separar múltiplos gêneros
-    genre_data['primary_genres'] = genre_data['primary_genres'].str.split(',')
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=gridsize)
 
-    # Remover espaços extras e explodir
-    genre_data = genre_data.explode('primary_genres')
-    genre_data['primary_genres'] = genre_data['primary_genres'].str.strip()
+    if log_x:
+        x_edges = 10 ** x_edges
 
-    # Contar aparições de cada gênero
-    genre_counts = genre_data['primary_genres'].value_counts()
+    return counts, x_edges, y_edges
 
-    # Definir mínimo de ocorrências (ex: pelo menos 20)
-    min_count = 100
-    valid_genres = genre_counts[genre_counts >= min_count].index
 
-    # Filtrar gêneros válidos
-    filtered_genre_data = genre_data[genre_data['primary_genres'].isin(valid_genres)]
+def plot_rating_vs_reviews(data, config: dict, density: bool | None = None, log_reviews: bool = False):
+    """
+    Gera o gráfico de média das avaliações vs. número de resenhas.
 
-    # Calcular média apenas dos válidos
-    genre_avg = filtered_genre_data.groupby('primary_genres')['avg_rating'].mean().reset_index()
-    genre_avg = genre_avg.sort_values(by='avg_rating', ascending=False).head(10)
+    Para conjuntos grandes, desenha apenas a grade agregada em vez de um ponto por linha.
 
-    # Plotar
-    plt.figure(figsize=(10, 6))
-    bars = plt.bar(genre_avg['primary_genres'], genre_avg['avg_rating'], color='skyblue')
-    plt.xlabel('Gêneros Primários')
+    @param data: Registros (ou DataFrame) com as colunas review_count e avg_rating
+    @param config: Configuração do pipeline
+    @param density: Força (True) ou desativa (False) o modo de densidade. Se None, o modo
+        é ativado acima de relationships.density_threshold linhas
+    @param log_reviews: Se True, o número de resenhas é exibido em escala logarítmica
+    """
+    options = config["relationships"]
+    if density is None:
+        density = len(data) > options['density_threshold']
+
+    plt.figure(figsize=(8, 6))
+    if density:
+        counts, x_edges, y_edges = compute_density_grid(
+            data['review_count'], data['avg_rating'], options['density_grid_size'], log_x=log_reviews
+        )
+        # Células vazias ficam transparentes
+        counts = np.ma.masked_equal(counts, 0)
+        mesh = plt.pcolormesh(x_edges, y_edges, counts.T, cmap='viridis')
+        plt.colorbar(mesh, label='Número de Lançamentos')
+    else:
+        plt.scatter(data['review_count'], data['avg_rating'], alpha=0.7)
+
+    if log_reviews:
+        plt.xscale('log')
+    plt.xlabel('Número de Resenhas')
     plt.ylabel('Média das Avaliações')
-    plt.xticks(rotation=45, ha='right')
+    plt.grid(True)
     plt.tight_layout()
+    save_figure('Media_vs_Resenhas', config['outputs'])
+    plt.close()
 
-    # Adicionar valores acima das barras
-    for bar in bars:
-        height = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width() / 2, height, f'{height:.2f}', ha='center', va='bottom')
 
-    plt.savefig('outputs/Media_por_Genero.png')
+def token_rating_means(records: ReleaseRecords, column: str, min_count: int):
+    """
+    Calcula a média das avaliações de cada valor de uma variável qualitativa.
 
-    # Gráfico 4: Descritores vs. Média das avaliações
-    descriptor_data = data[['descriptors', 'avg_rating']].dropna()
+    @param records: Registros dos lançamentos
+    @param column: Variável qualitativa (primary_genres ou descriptors)
+    @param min_count: Mínimo de ocorrências para o valor ser considerado
 
-    # Separar múltiplos descritores em listas
-    descriptor_data['descriptors'] = descriptor_data['descriptors'].str.split(',')
+    @return: Tupla (ids válidos, médias correspondentes)
+    """
+    tokens = records[column]
+    ratings = records['avg_rating'][tokens.row_index()]
 
-    # Remover espaços e explodir
-    descriptor_data = descriptor_data.explode('descriptors')
-    descriptor_data['descriptors'] = descriptor_data['descriptors'].str.strip()
+    counts = tokens.counts()
+    sums = np.bincount(tokens.ids, weights=ratings, minlength=len(tokens.vocabulary))
 
-    # Contar aparições de cada descritor
-    descriptor_counts = descriptor_data['descriptors'].value_counts()
+    valid_ids = np.flatnonzero(counts >= min_count)
+    return valid_ids, sums[valid_ids] / counts[valid_ids]
 
-    # Definir mínimo de ocorrências (ex: pelo menos 20)
-    min_count = 100
-    valid_descriptors = descriptor_counts[descriptor_counts >= min_count].index
 
-    # Filtrar descritores válidos
-    filtered_descriptor_data = descriptor_data[descriptor_data['descriptors'].isin(valid_descriptors)]
+def plot_token_means(
+    records: ReleaseRecords, config: dict, column: str, color: str, xlabel: str, filename: str
+):
+    """
+    Gera o gráfico de barras das maiores médias de avaliação por gênero/descritor.
+
+    @param records: Registros dos lançamentos
+    @param config: Configuração do pipeline
+    @param column: Variável qualitativa (primary_genres ou descriptors)
+    @param color: Cor das barras
+    @param xlabel: Rótulo do eixo X
+    @param filename: Nome do arquivo do gráfico, sem a extensão
+    """
+    options = config['relationships']
+    valid_ids, means = token_rating_means(records, column, options['min_count'])
 
-    # Calcular média apenas dos válidos
-    descriptor_avg = filtered_descriptor_data.groupby('descriptors')['avg_rating'].mean().reset_index()
-    descriptor_avg = descriptor_avg.sort_values(by='avg_rating', ascending=False).head(10)
+    # Ordena pela média decrescente e mantém os top_n primeiros
+    order = np.argsort(-means, kind='stable')[:options['top_n']]
+    vocabulary = records[column].vocabulary
+    names = [vocabulary[token_id] for token_id in valid_ids[order]]
 
     # Plotar
     plt.figure(figsize=(10, 6))
-    bars = plt.bar(descriptor_avg['descriptors'], descriptor_avg['avg_rating'], color='lightgreen')
-    plt.xlabel('Descritores')
+    bars = plt.bar(names, means[order], color=color)
+    plt.xlabel(xlabel)
     plt.ylabel('Média das Avaliações')
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
@@ -137,35 +152,80 @@ def plot_variable_relationships():
         height = bar.get_height()
         plt.text(bar.get_x() + bar.get_width() / 2, height, f'{height:.2f}', ha='center', va='bottom')
 
-    plt.savefig('outputs/Media_por_Descritor.png')
+    save_figure(filename, config['outputs'])
 
-    # Descritor por data
-    descriptor_time_data = data[['release_date', 'descriptors']].dropna()
-    descriptor_time_data['release_date'] = pd.to_datetime(descriptor_time_data['release_date'])
-    descriptor_time_data['year'] = descriptor_time_data['release_date'].dt.year
+    plt.close()
 
-    # Criar colunas de década
-    descriptor_time_data['decade'] = (descriptor_time_data['year'] // 10) * 10
-    descriptor_time_data['decade'] = descriptor_time_data['decade'].astype(int).astype(str) + 's'
 
-    # Explodir os descritores
-    descriptor_time_data['descriptors'] = descriptor_time_data['descriptors'].str.split(',')
-    descriptor_time_data = descriptor_time_data.explode('descriptors')
-    descriptor_time_data['descriptors'] = descriptor_time_data['descriptors'].str.strip()
+def descriptor_decade_table(records: ReleaseRecords, min_count: int, top_n: int) -> pd.DataFrame:
+    """
+    Tabela de frequência década x descritor, com os top_n descritores mais frequentes.
 
-    # Filtrar descritores frequentes
-    descriptor_counts = descriptor_time_data['descriptors'].value_counts()
-    min_count = 100
-    top_descriptors = descriptor_counts[descriptor_counts >= min_count].index
-    descriptor_time_data = descriptor_time_data[descriptor_time_data['descriptors'].isin(top_descriptors)]
+    @param records: Registros dos lançamentos
+    @param min_count: Mínimo de ocorrências para um descritor ser considerado
+    @param top_n: Número de descritores na tabela
+    """
+    descriptors = records['descriptors']
+    release_dates = records['release_date'][descriptors.row_index()]
+
+    # Década de cada ocorrência de descritor (ocorrências sem data ficam de fora)
+    has_date = ~np.isnat(release_dates)
+    decades = date_years(release_dates[has_date]) // 10 * 10
+    token_ids = descriptors.ids[has_date]
+
+    # Filtrar descritores frequentes e manter apenas os N mais frequentes
+    counts = descriptors.counts()
+    frequent = np.flatnonzero(counts >= min_count)
+    top_ids = frequent[np.argsort(-counts[frequent], kind='stable')[:top_n]]
+
+    # Posição de cada descritor na tabela (-1 para os que ficam de fora)
+    column_of = np.full(len(descriptors.vocabulary), -1)
+    column_of[top_ids] = np.arange(len(top_ids))
+
+    # As décadas consideradas são as que têm algum descritor frequente
+    is_frequent = counts[token_ids] >= min_count
+    decade_values, decade_index = np.unique(decades[is_frequent], return_inverse=True)
+    selected = column_of[token_ids[is_frequent]]
+    inside = selected >= 0
+    cells = np.bincount(
+        decade_index[inside] * len(top_ids) + selected[inside],
+        minlength=len(decade_values) * len(top_ids),
+    ).reshape(len(decade_values), len(top_ids))
+
+    return pd.DataFrame(
+        cells,
+        index=pd.Index([f'{decade}s' for decade in decade_values.tolist()], name='decade'),
+        columns=pd.Index([descriptors.vocabulary[token_id] for token_id in top_ids], name='descriptors'),
+    )
+
+
+def plot_rating_vs_date(records: ReleaseRecords, config: dict):
+    """
+    Gera o gráfico da média das avaliações por intervalo de data de lançamento.
+    """
+    has_date = ~np.isnat(records['release_date'])
+    data = pd.DataFrame({
+        'release_date': records['release_date'][has_date].astype('datetime64[ns]'),
+        'avg_rating': records['avg_rating'][has_date],
+    })
+    nbins = sturges_rule(len(data))
+    grouped_data = group_and_average(data, 'release_date', 'avg_rating', nbins)
+    grouped_data.plot(kind='line', x='Intervalo', y='Média', figsize=(10, 6), marker='o')
+    plt.xlabel('Intervalos de Data de Lançamento')
+    plt.ylabel('Média das Avaliações')
+    plt.xticks(rotation=45, ha='right')  # Rotacionar os rótulos do eixo X
+    plt.grid(True)
+    plt.tight_layout()
+    save_figure('Media_vs_Data', config['outputs'])
+    plt.close()
 
-    # Tabela de frequência: descritor vs. década
-    freq_table = pd.crosstab(descriptor_time_data['decade'], descriptor_time_data['descriptors'])
 
-    # Manter apenas os N descritores mais frequentes
-    top_N = 10
-    top_columns = freq_table.sum().sort_values(ascending=False).head(top_N).index
-    freq_table = freq_table[top_columns]
+def plot_descriptors_by_decade(records: ReleaseRecords, config: dict):
+    """
+    Gera o mapa de calor da frequência dos descritores mais comuns por década.
+    """
+    options = config['relationships']
+    freq_table = descriptor_decade_table(records, options['min_count'], options['top_n'])
 
     # Plotar heatmap
     plt.figure(figsize=(12, 6))
@@ -173,8 +233,44 @@ def plot_variable_relationships():
     plt.xlabel('Década')
     plt.ylabel('Descritor')
     plt.tight_layout()
-    plt.savefig('outputs/Descritores_por_Tempo.png')
+    save_figure('Descritores_por_Tempo', config['outputs'])
+    plt.close()
+
+
+# Mapeia o nome do gráfico em relationships.plots -> função que o gera
+RELATIONSHIP_PLOTTERS = {
+    'rating_vs_reviews': lambda records, config: plot_rating_vs_reviews(
+        records, config, log_reviews=config['relationships']['density_log_reviews']
+    ),
+    'rating_vs_date': plot_rating_vs_date,
+    'genre_means': lambda records, config: plot_token_means(
+        records, config, 'primary_genres', 'skyblue', 'Gêneros Primários', 'Media_por_Genero'
+    ),
+    'descriptor_means': lambda records, config: plot_token_means(
+        records, config, 'descriptors', 'lightgreen', 'Descritores', 'Media_por_Descritor'
+    ),
+    'descriptors_by_decade': plot_descriptors_by_decade,
+}
+
+
+def plot_variable_relationships(records: ReleaseRecords | None = None, config: dict | None = None):
+    """
+    Gera os gráficos de relação entre variáveis listados em relationships.plots.
+
+    @param records: Registros dos lançamentos; se None, são lidos do CSV
+    @param config: Configuração do pipeline; se None, é lida de config.CONFIG_PATH
+    """
+    if config is None:
+        config = load_config()
+    if records is None:
+        records = load_planned_records(config, ['relationships'])
+
+    # Configuração geral
+    plt.style.use('ggplot')
+
+    for plot in config['relationships']['plots']:
+        RELATIONSHIP_PLOTTERS[plot](records, config)
 
 
 if __name__ == "__main__":
-    plot_variable_relationships()
\ No newline at end of file
+    plot_variable_relationships()
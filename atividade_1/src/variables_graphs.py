@@ -2,39 +2,103 @@
 Módulo para geração de gráficos a partir das tabelas de frequência
 """
 
+import json
 import os
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 
-from frequency_tables import quantitative_vars, qualitative_vars, translation
+from config import load_config
+from frequency_tables import translation
+from output_formats import output_path, save_figure
 
 # Configurações gerais dos gráficos
 plt.style.use('ggplot')
 plt.rcParams.update({'font.size': 12})
 sns.set_palette("deep")
 
-def plot_qualitative_graph(filename: str):
+def read_class_edges(filename: str, output_options: dict) -> np.ndarray:
+    """
+    Lê as bordas exatas das classes salvas junto com a tabela de frequência
+
+    @param filename: Nome da variável (traduzido)
+    @param output_options: Seção [outputs] da configuração
+
+    @return: Bordas das classes (para datas, em dias desde 1970-01-01)
+    """
+
+    with open(output_path(output_options, f"{filename}_bordas.json"), "r", encoding="utf-8") as f:
+        return np.array(json.load(f)["Bordas"], dtype=float)
+
+
+def plot_kde_overlay(
+    ax, filename: str, df: pd.DataFrame, output_options: dict, kde_variables: list[str], is_date: bool = False
+):
+    """
+    Sobrepõe a densidade estimada (KDE) a um gráfico cujas classes ocupam as posições 0, 1, 2...
+
+    A densidade é convertida na frequência esperada de cada classe, para ficar na mesma
+    escala das barras. Se a variável não estiver em frequency_tables.kde, nada é desenhado
+    (mesmo que haja um KDE antigo no diretório de saída).
+
+    @param ax: Eixo do gráfico
+    @param filename: Nome da variável (traduzido)
+    @param df: Tabela de frequência desenhada no gráfico
+    @param output_options: Seção [outputs] da configuração
+    @param kde_variables: Variáveis com KDE (frequency_tables.kde)
+    @param is_date: Se True, a variável é uma data
+    """
+
+    if filename not in [translation[variable] for variable in kde_variables]:
+        return
+
+    kde = pd.read_csv(output_path(output_options, f"{filename}_kde.csv"))
+    edges = read_class_edges(filename, output_options)
+    nbins = len(edges) - 1
+
+    if is_date:
+        x = kde[filename].to_numpy().astype('datetime64[D]').astype(np.int64).astype(float)
+    else:
+        x = kde[filename].to_numpy(dtype=float)
+    density = kde["Densidade"].to_numpy()
+
+    # Mantém apenas os pontos dentro do intervalo coberto pelas classes
+    inside = (x >= edges[0]) & (x <= edges[-1])
+    x, density = x[inside], density[inside]
+
+    # Frequência esperada = densidade * total de observações * largura da classe
+    bin_index = np.clip(np.searchsorted(edges, x, side='right') - 1, 0, nbins - 1)
+    expected = density * df["Frequência"].sum() * np.diff(edges)[bin_index]
+
+    # Converte cada valor para a posição correspondente no eixo das classes
+    positions = np.interp(x, edges, np.arange(nbins + 1) - 0.5)
+    ax.plot(positions, expected, color='black', linewidth=2, label='Densidade (KDE)')
+    ax.legend()
+
+
+def plot_qualitative_graph(filename: str, output_options: dict, size_limit: int):
     """
     Gera um gráfico de barras para variáveis qualitativas
     
     @param nome_arquivo: Nome do arquivo CSV sem a extensão
     @param titulo: Título do gráfico
+    @param output_options: Seção [outputs] da configuração
+    @param size_limit: Número de entradas mostradas (frequency_tables.size_limit)
     """
 
     # Lê o arquivo CSV
-    df = pd.read_csv(f"outputs/{filename}_table.csv")
+    df = pd.read_csv(output_path(output_options, f"{filename}_table.csv"))
     
-    # Limita a quantidade de entradas para melhor visualização
-    if len(df) > 15:
-        df = df.iloc[:15].copy()  # Copia apenas as 10 primeiras linhas
+    # Limita a quantidade de entradas para melhor visualização (deixa de fora a linha "Others")
+    if len(df) > size_limit:
+        df = df.iloc[:size_limit].copy()
     
     plt.figure(figsize=(12, 8))
     
     # Gráfico de barras
     ax = sns.barplot(x=filename, y="Frequência", data=df)
-    plt.title("Mostrando apenas as 15 maiores frequências")
+    plt.title(f"Mostrando apenas as {size_limit} maiores frequências")
     plt.xlabel(filename)
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
@@ -45,22 +109,21 @@ def plot_qualitative_graph(filename: str):
         ax.text(i, v + 0.01 * max_value, str(v), ha='center')
     
     # Salva o gráfico
-    plt.savefig(f"outputs/{filename}_grafico.png", dpi=300)
+    save_figure(f"{filename}_grafico", output_options)
     plt.close()
 
-def plot_quantitative_graph(filename: str):
+def plot_quantitative_graph(filename: str, output_options: dict, kde_variables: list[str]):
     """
     Gera um histograma para variáveis quantitativas
     
     @param nome_arquivo: Nome do arquivo CSV sem a extensão
     @param titulo: Título do gráfico
+    @param output_options: Seção [outputs] da configuração
+    @param kde_variables: Variáveis com KDE (frequency_tables.kde)
     """
 
     # Lê o arquivo CSV
-    path = f"outputs/{filename}_table.csv"
-    if filename == "Número de resenhas":
-        path = f"outputs/{filename}_ajustado_table.csv"
-    df = pd.read_csv(path)
+    df = pd.read_csv(output_path(output_options, f"{filename}_table.csv"))
     
     plt.figure(figsize=(12, 8))
     
@@ -78,23 +141,29 @@ def plot_quantitative_graph(filename: str):
     # Adiciona os valores sobre as barras
     for i, v in enumerate(frequencies):
         ax.text(i, v + 5, str(v), ha='center')
+
+    # Sobrepõe a densidade estimada, se houver
+    plot_kde_overlay(ax, filename, df, output_options, kde_variables)
     
     # Salva o gráfico
-    plt.savefig(f"outputs/{filename}_grafico.png", dpi=300)
+    save_figure(f"{filename}_grafico", output_options)
     plt.close()
 
-def plot_release_date_graph(filename: str ="release_date"):
+def plot_release_date_graph(filename: str, output_options: dict, kde_variables: list[str]):
     """
     Gera um gráfico de linha para a variável de data de lançamento
     
     @param nome_arquivo: Nome do arquivo CSV sem a extensão
     @param titulo: Título do gráfico
+    @param output_options: Seção [outputs] da configuração
+    @param kde_variables: Variáveis com KDE (frequency_tables.kde)
     """
 
     # Lê o arquivo CSV
-    df = pd.read_csv(f"outputs/{filename}_table.csv")
+    df = pd.read_csv(output_path(output_options, f"{filename}_table.csv"))
     
     plt.figure(figsize=(12, 8))
+    ax = plt.gca()
     
     # Extrai datas e frequências
     # Obtém apenas o ano do intervalo (primeiro 4 dígitos)
@@ -102,70 +171,99 @@ def plot_release_date_graph(filename: str ="release_date"):
     frequencies = df["Frequência"].tolist()
     
     # Gráfico de linha para mostrar tendência temporal
-    plt.plot(years, frequencies, marker='o', linewidth=2, markersize=8)
+    # Cada classe ocupa uma posição inteira, rotulada com o ano inicial
+    positions = range(len(years))
+    plt.plot(positions, frequencies, marker='o', linewidth=2, markersize=8)
     plt.xlabel("Ano")
     plt.ylabel("Número de Lançamentos")
     plt.grid(True)
-    plt.xticks(rotation=45)
+    plt.xticks(positions, years, rotation=45)
+
+    # Sobrepõe a densidade estimada, se houver
+    plot_kde_overlay(ax, filename, df, output_options, kde_variables, is_date=True)
     plt.tight_layout()
     
     # Salva o gráfico
-    plt.savefig(f"outputs/{filename}_grafico.png", dpi=300)
+    save_figure(f"{filename}_grafico", output_options)
     plt.close()
 
- #Distribuicao da media das avaliacoes
-def plot_boxplot(filename: str = "Média das avaliações",
-                 graphname: str = "boxplot"
-                 ):
+def plot_boxplot(output_options: dict, group: str = "geral", graphname: str = "boxplot", xlabel: str = ""):
+    """
+    Gera o boxplot da média das avaliações a partir das estatísticas já calculadas
+    (quartis, bigodes e outliers), sem passar os dados brutos ao matplotlib
+
+    Se o grupo não tiver nenhuma caixa (ex.: nenhum gênero atinge boxplot_min_count ou
+    nenhuma data foi lida), o gráfico é salvo apenas com um aviso.
+
+    @param output_options: Seção [outputs] da configuração
+    @param group: Grupo em boxplot_stats.json ("geral", "genero" ou "decada")
+    @param graphname: Nome do arquivo do gráfico, sem o sufixo
+    @param xlabel: Rótulo do eixo X
+    """
+
+    with open(output_path(output_options, "boxplot_stats.json"), "r", encoding="utf-8") as f:
+        stats = json.load(f)[group]
 
-    df = pd.read_csv(f"outputs/{filename}_table.csv")
-    
     plt.figure(figsize=(12, 8))
-    
-    # 1. Converter intervalos para valores numéricos (usando o ponto médio)
-    df['Ponto Médio'] = df[filename].apply(lambda x: np.mean([float(i) for i in x.split(' - ')]))
-    
-    # 2. Ajeita os dados 
-    stats = {
-        'med': 2.54,    # Mediana (Q2)
-        'q1': 3.28,     # Primeiro quartil (25%)
-        'q3': 3.80,     # Terceiro quartil (75%)
-        'whislo': 2.5, # Mínimo (sem outliers)
-        'whishi': 4.58  # Máximo (sem outliers)
-    }
-    
-    
-    # 4. Criar o boxplot com os dados simulados
-    a = sns.boxplot(x=df['Ponto Médio'],
-                          showfliers = True,
-                       color = 'skyblue',
-                        vert= False)    
+    ax = plt.gca()
+
+    if stats:
+        ax.bxp(stats, showfliers=True, showmeans=True, patch_artist=True,
+               boxprops={'facecolor': 'skyblue'})
+    else:
+        # Axes.bxp não aceita uma lista vazia
+        ax.text(0.5, 0.5, "Nenhum grupo com lançamentos suficientes", ha='center', va='center',
+                transform=ax.transAxes)
+    plt.xlabel(xlabel)
+    plt.ylabel("Média das avaliações")
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
 
     # Salva o gráfico
-    plt.savefig(f"outputs/{graphname}_grafico.png", dpi=300, bbox_inches='tight')
+    save_figure(f"{graphname}_grafico", output_options, bbox_inches='tight')
     plt.close()
 
 
-def plot_all_graphs():
+def plot_all_graphs(config: dict | None = None, verbose: bool = True):
     """
-    Função principal que gera todos os gráficos
+    Função principal que gera os gráficos das variáveis configuradas
+
+    Os gráficos são feitos a partir das tabelas de frequência e de boxplot_stats.json; os
+    que dependem de uma etapa desativada (frequency_tables ou summary_statistics) não são gerados.
+
+    @param config: Configuração do pipeline; se None, é lida de config.CONFIG_PATH
+    @param verbose: Se True, imprime uma mensagem ao final
     """
 
-    # Cria o diretório outputs se não existir
-    if not os.path.exists("outputs"):
-        os.makedirs("outputs")
-        
-    # Gera gráficos para variáveis qualitativas
-    for variable in qualitative_vars:
-        plot_qualitative_graph(translation[variable])
-    
-    # Gera gráficos para variáveis quantitativas
-    plot_release_date_graph(translation["release_date"])
-    plot_quantitative_graph(translation["avg_rating"])
-    plot_quantitative_graph(translation["review_count"])
-    plot_boxplot()
-    
-    print("Todos os gráficos foram gerados com sucesso!")
+    if config is None:
+        config = load_config()
+    output_options = config["outputs"]
+
+    # Cria o diretório de saída se não existir
+    os.makedirs(output_options["directory"], exist_ok=True)
+
+    if config["frequency_tables"]["enabled"]:
+        # Gera gráficos para variáveis qualitativas
+        size_limit = config["frequency_tables"]["size_limit"]
+        for variable in config["variables"]["qualitative"]:
+            plot_qualitative_graph(translation[variable], output_options, size_limit)
+
+        # Gera gráficos para variáveis quantitativas
+        kde_variables = config["frequency_tables"]["kde"]
+        for variable in config["variables"]["quantitative"]:
+            if variable == "release_date":
+                plot_release_date_graph(translation[variable], output_options, kde_variables)
+            else:
+                plot_quantitative_graph(translation[variable], output_options, kde_variables)
+
+    summary_options = config["summary_statistics"]
+    if summary_options["enabled"] and summary_options["boxplots"]:
+        plot_boxplot(output_options)
+        plot_boxplot(output_options, "genero", "boxplot_genero", "Gêneros primários")
+        plot_boxplot(output_options, "decada", "boxplot_decada", "Década")
+
+    if verbose:
+        print("Todos os gráficos foram gerados com sucesso!")
 
 if __name__ == "__main__":
     plot_all_graphs()
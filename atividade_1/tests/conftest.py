@@ -0,0 +1,13 @@
+"""
+Configuração dos testes: os módulos de src/ se importam pelo nome (como nos scripts),
+então a pasta é adicionada ao caminho de importação
+"""
+
+import os
+import sys
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from binning import BINNING_STRATEGIES, compute_bin_edges, count_in_bins, sort_weighted_values
+from frequency_tables import create_class_labels
+
+
+@pytest.mark.parametrize("strategy", list(BINNING_STRATEGIES))
+@pytest.mark.parametrize("variable, value", [("review_count", 42.0), ("avg_rating", 3.5)])
+def test_single_value_gives_one_class(strategy, variable, value):
+    sorted_vals, cum_weights = sort_weighted_values([(value, 7)])
+
+    edges = compute_bin_edges(strategy, sorted_vals, cum_weights)
+    counts = count_in_bins(sorted_vals, cum_weights, edges)
+    labels = create_class_labels(variable, edges, len(edges) - 1)
+
+    assert len(edges) == 2
+    assert counts == [7]
+    assert len(labels) == 1
+
+
+@pytest.mark.parametrize("strategy", list(BINNING_STRATEGIES))
+def test_integer_variable_labels_are_not_inverted(strategy):
+    rng = np.random.default_rng(0)
+    counts = rng.geometric(0.02, size=2000)
+    values, frequencies = np.unique(counts, return_counts=True)
+    sorted_vals, cum_weights = sort_weighted_values(list(zip(values.tolist(), frequencies.tolist())))
+
+    edges = compute_bin_edges(strategy, sorted_vals, cum_weights)
+    labels = create_class_labels("review_count", edges, len(edges) - 1)
+
+    assert np.all(edges == np.round(edges))
+    assert np.all(np.diff(edges) > 0)
+    for label in labels:
+        low, high = (int(bound) for bound in label.split(" - "))
+        assert low <= high
+    assert sum(count_in_bins(sorted_vals, cum_weights, edges)) == len(counts)
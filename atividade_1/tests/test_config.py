@@ -0,0 +1,26 @@
+import copy
+
+import pytest
+
+from config import DEFAULT_CONFIG, validate_config
+
+
+def test_default_config_is_valid():
+    validate_config(copy.deepcopy(DEFAULT_CONFIG))
+
+
+@pytest.mark.parametrize(
+    "section, key, value",
+    [
+        ("outputs", "figure_formats", ["png", "jpeg"]),
+        ("outputs", "table_formats", ["xlsx"]),
+        ("frequency_tables", "binning", {"avg_rting": "sturges"}),
+        ("frequency_tables", "binning", {"artist_name": "sturges"}),
+    ],
+)
+def test_unknown_option_is_rejected(section, key, value):
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config[section][key] = value
+
+    with pytest.raises(ValueError, match=f"{section}.{key}"):
+        validate_config(config)
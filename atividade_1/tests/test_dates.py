@@ -0,0 +1,27 @@
+import numpy as np
+
+from dates import date_bin_edges, date_class_labels
+
+
+def test_range_shorter_than_bin_count():
+    # Três dias (1970-01-01 a 1970-01-03) divididos em dez classes
+    edges = date_bin_edges(0, 2, 10)
+    labels = date_class_labels(edges)
+
+    assert edges.tolist() == [0, 1, 2, 3]
+    assert labels == ["1970-01-01 - 1970-01-01", "1970-01-02 - 1970-01-02", "1970-01-03 - 1970-01-03"]
+
+
+def test_single_day_gives_one_class():
+    edges = date_bin_edges(5, 5, 4)
+
+    assert edges.tolist() == [5, 6]
+    assert date_class_labels(edges) == ["1970-01-06 - 1970-01-06"]
+
+
+def test_edges_are_strictly_increasing():
+    edges = date_bin_edges(-3650, 20000, 37)
+
+    assert len(edges) == 38
+    assert np.all(np.diff(edges) > 0)
+    assert edges[0] == -3650 and edges[-1] == 20001
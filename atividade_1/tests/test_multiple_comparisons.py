@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from multiple_comparisons import CORRECTIONS, adjust_p_values
+
+
+@pytest.mark.parametrize(
+    "method, expected",
+    [
+        ("bonferroni", [0.003, 0.03, np.nan, 0.06]),
+        ("holm", [0.003, 0.02, np.nan, 0.02]),
+        ("fdr_bh", [0.003, 0.015, np.nan, 0.02]),
+    ],
+)
+def test_nan_is_kept_and_not_counted(method, expected):
+    adjusted = adjust_p_values([0.001, 0.01, np.nan, 0.02], method)
+
+    np.testing.assert_allclose(adjusted, expected)
+
+
+@pytest.mark.parametrize("method", CORRECTIONS)
+def test_all_nan(method):
+    assert np.isnan(adjust_p_values([np.nan, np.nan], method)).all()
@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+HEADER = (
+    '"","position","release_name","artist_name","release_date","release_type","primary_genres",'
+    '"secondary_genres","descriptors","avg_rating","rating_count","review_count"\n'
+)
+ROW = '"{i}",{i},"Album {i}","Artist {i}",1997-06-16,"album","Art Rock, Electronic","NA","cold, atmospheric",{rating},100,{i}\n'
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def test_column_outlives_records(tmp_path):
+    n_rows = 3000
+    path = tmp_path / "releases.csv"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(HEADER)
+        for i in range(n_rows):
+            f.write(ROW.format(i=i, rating=(i % 100) / 20))
+
+    # Roda em outro processo: um acesso à memória compartilhada já liberada derruba o interpretador
+    script = textwrap.dedent(
+        f"""
+        import gc
+        import numpy as np
+        import parallel_reader
+
+        parallel_reader.MIN_CHUNK_SIZE = 1024
+        records = parallel_reader.load_records_parallel({str(path)!r}, workers=3, reader="mmap")
+        column = records["avg_rating"]
+        del records
+        gc.collect()
+        print(np.sum(column))
+        """
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": SRC},
+        timeout=120,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert float(result.stdout) == sum((i % 100) / 20 for i in range(n_rows))
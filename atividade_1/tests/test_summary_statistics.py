@@ -0,0 +1,25 @@
+import copy
+import json
+
+from config import DEFAULT_CONFIG
+from records import load_records
+from summary_statistics import get_summary_statistics
+
+HEADER = (
+    '"","position","release_name","artist_name","release_date","release_type","primary_genres",'
+    '"secondary_genres","descriptors","avg_rating","rating_count","review_count"\n'
+)
+
+
+def test_header_only_csv(tmp_path):
+    path = tmp_path / "empty.csv"
+    path.write_text(HEADER, encoding="utf-8")
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config["outputs"]["directory"] = str(tmp_path)
+
+    get_summary_statistics(load_records(str(path), workers=1), config)
+
+    with open(tmp_path / "boxplot_stats.json", encoding="utf-8") as f:
+        assert json.load(f) == {"geral": [], "genero": [], "decada": []}
+    summary = (tmp_path / "estatisticas_resumo.txt").read_text(encoding="utf-8")
+    assert summary.count("Nenhum valor válido") == 6